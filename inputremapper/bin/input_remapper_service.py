@@ -26,7 +26,7 @@ from argparse import ArgumentParser
 from inputremapper.configs.global_config import GlobalConfig
 from inputremapper.injection.global_uinputs import GlobalUInputs, UInput
 from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
-from inputremapper.logging.logger import logger
+from inputremapper.logging.logger import logger, flush_monitor_on_sigterm
 
 
 class InputRemapperServiceBin:
@@ -55,6 +55,7 @@ class InputRemapperServiceBin:
         multiprocessing.set_start_method("fork")
 
         logger.update_verbosity(options.debug)
+        flush_monitor_on_sigterm()
 
         # import input-remapper stuff after setting the log verbosity
         from inputremapper.daemon import Daemon
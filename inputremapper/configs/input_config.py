@@ -20,6 +20,7 @@
 from __future__ import annotations
 
 import itertools
+from functools import cached_property
 from typing import Tuple, Iterable, Union, List, Dict, Optional, Hashable
 
 from evdev import ecodes
@@ -325,6 +326,8 @@ InputCombinationInit = Union[
 class InputCombination(Tuple[InputConfig, ...]):
     """One or more InputConfigs used to trigger a mapping."""
 
+    _empty_combination: Optional[InputCombination] = None
+
     # tuple is immutable, therefore we need to override __new__()
     # https://jfine-python-classes.readthedocs.io/en/latest/subclass-tuple.html
     def __new__(cls, configs: InputCombinationInit) -> InputCombination:
@@ -388,9 +391,18 @@ class InputCombination(Tuple[InputConfig, ...]):
     def empty_combination(cls) -> InputCombination:
         """A combination that has default invalid (to evdev) values.
 
-        Useful for the UI to indicate that this combination is not set
+        Useful for the UI to indicate that this combination is not set.
+        Always returns the same object, since it is immutable anyway.
         """
-        return cls([{"type": EMPTY_TYPE, "code": 99, "analog_threshold": 99}])
+        # look into the __dict__, so that subclasses get their own instance
+        empty_combination = cls.__dict__.get("_empty_combination")
+        if empty_combination is None:
+            empty_combination = cls(
+                [{"type": EMPTY_TYPE, "code": 99, "analog_threshold": 99}]
+            )
+            cls._empty_combination = empty_combination
+
+        return empty_combination
 
     @classmethod
     def from_tuples(cls, *tuples):
@@ -436,6 +448,11 @@ class InputCombination(Tuple[InputConfig, ...]):
         """Check if there is any analog input in self."""
         return True in tuple(i.defines_analog_input for i in self)
 
+    @cached_property
+    def has_rel_input(self) -> bool:
+        """Check if any of the inputs is a relative axis, like a mouse movement."""
+        return any(input_config.type == ecodes.EV_REL for input_config in self)
+
     def find_analog_input_config(
         self, type_: Optional[int] = None
     ) -> Optional[InputConfig]:
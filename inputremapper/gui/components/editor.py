@@ -24,8 +24,19 @@
 from __future__ import annotations
 
 from collections import defaultdict
+import logging
 import shlex
-from typing import List, Optional, Dict, Union, Callable, Literal, Set, TYPE_CHECKING
+from typing import (
+    List,
+    Optional,
+    Dict,
+    Union,
+    Callable,
+    Literal,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
 
 import cairo
 from evdev.ecodes import (
@@ -77,6 +88,7 @@ if TYPE_CHECKING:
 Capabilities = Dict[int, List]
 
 SET_KEY_FIRST = _("Record the input first")
+CHANGE_MAPPING_NAME = _("Change Mapping Name") + " (F2)"
 
 ICON_NAMES = {
     DeviceType.GAMEPAD: "input-gaming",
@@ -87,6 +99,20 @@ ICON_NAMES = {
     DeviceType.UNKNOWN: None,
 }
 
+# maps Gdk button numbers to evdev codes
+GDK_BUTTON_TO_EVDEV = {
+    Gdk.BUTTON_MIDDLE: BTN_MIDDLE,
+    Gdk.BUTTON_PRIMARY: BTN_LEFT,
+    Gdk.BUTTON_SECONDARY: BTN_RIGHT,
+    9: BTN_EXTRA,
+    8: BTN_SIDE,
+}
+
+PRESS_EVENT_TYPES = frozenset((Gdk.EventType.KEY_PRESS, Gdk.EventType.BUTTON_PRESS))
+RELEASE_EVENT_TYPES = frozenset(
+    (Gdk.EventType.KEY_RELEASE, Gdk.EventType.BUTTON_RELEASE)
+)
+
 # sort types that most devices would fall in easily to the right.
 ICON_PRIORITIES = [
     DeviceType.GRAPHICS_TABLET,
@@ -161,31 +187,58 @@ class MappingListBox:
         self._controller = controller
         self._gui = listbox
         self._gui.set_sort_func(self._sort_func)
+        self._rows_by_combination: Dict[InputCombination, MappingSelectionLabel] = {}
 
         self._message_broker.subscribe(MessageType.preset, self._on_preset_changed)
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_changed)
+        self._message_broker.subscribe(
+            MessageType.combination_update, self._on_combination_update
+        )
         self._gui.connect("row-selected", self._on_gtk_mapping_selected)
 
     @staticmethod
     def _sort_func(row1: MappingSelectionLabel, row2: MappingSelectionLabel) -> int:
-        """Sort alphanumerical by name."""
-        if row1.combination == InputCombination.empty_combination():
-            return 1
-        if row2.combination == InputCombination.empty_combination():
-            return 0
+        """Sort alphanumerical by name, with the empty mapping at the bottom."""
+        if row1.sort_empty != row2.sort_empty:
+            return 1 if row1.sort_empty else -1
 
-        return 0 if row1.name < row2.name else 1
+        name1 = row1.sort_name
+        name2 = row2.sort_name
+        return (name1 > name2) - (name1 < name2)
 
     def _on_preset_changed(self, data: PresetData):
+        # Rows are recycled instead of being rebuilt for every preset, so that
+        # switching between presets doesn't construct all widgets and message
+        # subscriptions from scratch.
         selection_labels = self._gui.get_children()
-        for selection_label in selection_labels:
+        mappings = data.mappings or ()
+
+        if self._shows_mappings(selection_labels, mappings):
+            # For example only the autoload setting changed
+            return
+
+        with HandlerDisabled(self._gui, self._on_gtk_mapping_selected):
+            self._gui.unselect_all()
+
+        for selection_label, mapping in zip(selection_labels, mappings):
+            selection_label.rebind(mapping.format_name(), mapping.input_combination)
+
+        for selection_label in selection_labels[len(mappings) :]:
             selection_label.cleanup()
             self._gui.remove(selection_label)
 
-        if not data.mappings:
+        self._rows_by_combination = {
+            selection_label.combination: selection_label
+            for selection_label in selection_labels[: len(mappings)]
+        }
+
+        if not mappings:
             return
 
-        for mapping in data.mappings:
+        # Inserting into a sorted listbox places each row individually. Insert
+        # them unsorted instead, and sort everything once at the end.
+        self._gui.set_sort_func(None)
+        for mapping in mappings[len(selection_labels) :]:
             selection_label = MappingSelectionLabel(
                 self._message_broker,
                 self._controller,
@@ -193,15 +246,40 @@ class MappingListBox:
                 mapping.input_combination,
             )
             self._gui.insert(selection_label, -1)
-        self._gui.invalidate_sort()
+            self._rows_by_combination[mapping.input_combination] = selection_label
+
+        # setting the sort_func invalidates the sort
+        self._gui.set_sort_func(self._sort_func)
+
+    def _shows_mappings(
+        self,
+        selection_labels: List[MappingSelectionLabel],
+        mappings: Tuple[MappingData, ...],
+    ) -> bool:
+        """Check if the rows already display exactly those mappings."""
+        if len(selection_labels) != len(mappings):
+            return False
+
+        for mapping in mappings:
+            row = self._rows_by_combination.get(mapping.input_combination)
+            if row is None or row.name != mapping.format_name():
+                return False
+
+        # there could be duplicate combinations
+        return len(self._rows_by_combination) == len(mappings)
 
     def _on_mapping_changed(self, mapping: MappingData):
         with HandlerDisabled(self._gui, self._on_gtk_mapping_selected):
-            combination = mapping.input_combination
+            row = self._rows_by_combination.get(mapping.input_combination)
+            if row is not None:
+                self._gui.select_row(row)
 
-            for row in self._gui.get_children():
-                if row.combination == combination:
-                    self._gui.select_row(row)
+    def _on_combination_update(self, data: CombinationUpdate):
+        # Same condition as in MappingSelectionLabel._on_combination_update
+        row = self._rows_by_combination.get(data.old_combination)
+        if row is not None and row.is_selected():
+            del self._rows_by_combination[data.old_combination]
+            self._rows_by_combination[data.new_combination] = row
 
     def _on_gtk_mapping_selected(self, _, row: Optional[MappingSelectionLabel]):
         if not row:
@@ -214,6 +292,10 @@ class MappingSelectionLabel(Gtk.ListBoxRow):
 
     __gtype_name__ = "MappingSelectionLabel"
 
+    # what the MappingListBox sorts by
+    sort_empty: bool = False
+    sort_name: str = ""
+
     def __init__(
         self,
         message_broker: MessageBroker,
@@ -230,6 +312,7 @@ class MappingSelectionLabel(Gtk.ListBoxRow):
 
         self.name = name
         self.combination = combination
+        self._update_sort_key()
         # add hotkey handler
         self.connect("key-press-event", self._on_key_press)
 
@@ -248,10 +331,10 @@ class MappingSelectionLabel(Gtk.ListBoxRow):
         # button to edit the name of the mapping
         self.edit_btn = Gtk.Button()
         self.edit_btn.set_relief(Gtk.ReliefStyle.NONE)
-        self.edit_btn.set_image(
-            Gtk.Image.new_from_icon_name(Gtk.STOCK_EDIT, Gtk.IconSize.MENU)
-        )
-        self.edit_btn.set_tooltip_text(_("Change Mapping Name") + " (F2)")
+        edit_icon = Gtk.Image.new_from_icon_name(Gtk.STOCK_EDIT, Gtk.IconSize.MENU)
+        edit_icon.show()
+        self.edit_btn.set_image(edit_icon)
+        self.edit_btn.set_tooltip_text(CHANGE_MAPPING_NAME)
         self.edit_btn.set_margin_top(4)
         self.edit_btn.set_margin_bottom(4)
         self.edit_btn.connect("clicked", self._set_edit_mode)
@@ -272,18 +355,46 @@ class MappingSelectionLabel(Gtk.ListBoxRow):
         self._box.set_child_packing(self.name_input, True, True, 4, Gtk.PackType.START)
 
         self.add(self._box)
-        self.show_all()
+        # Only show what is visible while not selected. The edit_btn and
+        # name_input stay hidden, no need to show_all and hide them again.
+        self.label.show()
+        self._box.show()
+        self.show()
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_changed)
         self._message_broker.subscribe(
             MessageType.combination_update, self._on_combination_update
         )
 
-        self.edit_btn.hide()
-        self.name_input.hide()
-
     def __repr__(self):
         return f"<MappingSelectionLabel for {self.combination} as {self.name} at {hex(id(self))}>"
 
+    def rebind(self, name: Optional[str], combination: InputCombination) -> None:
+        """Show a different mapping in this row, reusing the existing widgets."""
+        if not name:
+            name = combination.beautify()
+
+        self.name = name
+        self.combination = combination
+        self._update_sort_key()
+        self.label.set_label(name)
+        self.name_input.set_text(name)
+        self._set_not_selected()
+
+    def _update_sort_key(self) -> bool:
+        """Update what the MappingListBox sorts by.
+
+        Computed once per change of name or combination, not per comparison.
+        Returns True if it changed.
+        """
+        sort_empty = self.combination == InputCombination.empty_combination()
+        sort_name = self.name.casefold()
+        if sort_empty == self.sort_empty and sort_name == self.sort_name:
+            return False
+
+        self.sort_empty = sort_empty
+        self.sort_name = sort_name
+        return True
+
     def _set_not_selected(self):
         self.edit_btn.hide()
         self.name_input.hide()
@@ -316,11 +427,16 @@ class MappingSelectionLabel(Gtk.ListBoxRow):
             return
         self.name = mapping.format_name()
         self._set_selected()
-        self.get_parent().invalidate_sort()
+
+        if self._update_sort_key():
+            # only moves this row, instead of re-sorting the whole listbox
+            self.changed()
 
     def _on_combination_update(self, data: CombinationUpdate):
         if data.old_combination == self.combination and self.is_selected():
             self.combination = data.new_combination
+            if self._update_sort_key():
+                self.changed()
 
     def _on_gtk_rename_finished(self, *_):
         name = self.name_input.get_text()
@@ -343,84 +459,79 @@ class MappingSelectionLabel(Gtk.ListBoxRow):
 class GdkEventRecorder:
     """Records events delivered by GDK, similar to the ReaderService/ReaderClient."""
 
-    _combination: List[int]
+    # used as an ordered set
+    _combination: Dict[int, None]
     _pressed: Set[int]
 
     __gtype_name__ = "GdkEventRecorder"
 
     def __init__(self, window: Gtk.Window, gui: Gtk.Label):
         super().__init__()
-        self._combination = []
+        self._combination = {}
         self._pressed = set()
+        # keyboard_layout.get_name searches the whole xmodmap
+        self._names: Dict[int, Optional[str]] = {}
         self._gui = gui
         window.connect("event", self._on_gtk_event)
 
     def _get_button_code(self, event: Gdk.Event):
         """Get the evdev code for the given event."""
-        return {
-            Gdk.BUTTON_MIDDLE: BTN_MIDDLE,
-            Gdk.BUTTON_PRIMARY: BTN_LEFT,
-            Gdk.BUTTON_SECONDARY: BTN_RIGHT,
-            9: BTN_EXTRA,
-            8: BTN_SIDE,
-        }.get(event.get_button().button)
-
-    def _reset(self, event: Gdk.Event):
-        """If a new combination is being typed, start from scratch."""
-        gdk_event_type: int = event.type
-
-        is_press = gdk_event_type in [
-            Gdk.EventType.KEY_PRESS,
-            Gdk.EventType.BUTTON_PRESS,
-        ]
+        return GDK_BUTTON_TO_EVDEV.get(event.get_button().button)
 
-        if len(self._pressed) == 0 and is_press:
-            self._combination = []
+    def _reset(self):
+        """If a new combination is being typed, start from scratch."""
+        if len(self._pressed) == 0:
+            self._combination = {}
 
-    def _press(self, event: Gdk.Event):
-        """Remember pressed keys, write down combinations."""
-        gdk_event_type: int = event.type
+    def _press(self, event: Gdk.Event) -> bool:
+        """Remember pressed keys, write down combinations.
 
-        if gdk_event_type == Gdk.EventType.KEY_PRESS:
+        Returns True if the combination changed.
+        """
+        if event.type == Gdk.EventType.KEY_PRESS:
             code = event.hardware_keycode - XKB_KEYCODE_OFFSET
-            if code not in self._combination:
-                self._combination.append(code)
-
-            self._pressed.add(code)
-
-        if gdk_event_type == Gdk.EventType.BUTTON_PRESS:
+        else:
             code = self._get_button_code(event)
-            if code not in self._combination:
-                self._combination.append(code)
 
-            self._pressed.add(code)
+        self._pressed.add(code)
+        if code in self._combination:
+            return False
 
-    def _release(self, event: Gdk.Event):
-        """Clear pressed keys if this is a release event."""
-        if event.type in [Gdk.EventType.KEY_RELEASE, Gdk.EventType.BUTTON_RELEASE]:
-            self._pressed = set()
+        self._combination[code] = None
+        return True
 
-    def _display(self, event):
-        """Show the recorded combination in the gui."""
-        is_press = event.type in [
-            Gdk.EventType.KEY_PRESS,
-            Gdk.EventType.BUTTON_PRESS,
-        ]
+    def _release(self):
+        """Clear pressed keys."""
+        self._pressed = set()
 
-        if is_press and len(self._combination) > 0:
+    def _display(self):
+        """Show the recorded combination in the gui."""
+        if len(self._combination) > 0:
             names = [
-                keyboard_layout.get_name(code)
+                name
                 for code in self._combination
-                if code is not None and keyboard_layout.get_name(code) is not None
+                if code is not None and (name := self._get_name(code)) is not None
             ]
             self._gui.set_text(" + ".join(names))
 
+    def _get_name(self, code: int) -> Optional[str]:
+        if code not in self._names:
+            self._names[code] = keyboard_layout.get_name(code)
+
+        return self._names[code]
+
     def _on_gtk_event(self, _, event: Gdk.Event):
         """For all sorts of input events that gtk cares about."""
-        self._reset(event)
-        self._release(event)
-        self._press(event)
-        self._display(event)
+        # This is called for every event of the window, including motion events,
+        # so get rid of everything that isn't a press or release quickly.
+        gdk_event_type = event.type
+        if gdk_event_type in PRESS_EVENT_TYPES:
+            self._reset()
+            if self._press(event):
+                # key-repeat of a held key doesn't change the text
+                self._display()
+        elif gdk_event_type in RELEASE_EVENT_TYPES:
+            self._release()
 
 
 class CodeEditor:
@@ -455,6 +566,14 @@ class CodeEditor:
         #  python = language_manager.get_language("python")
         # source_view.get_buffer().set_language(python)
 
+        # The text of the buffer, cached until it changes. This handler is never
+        # blocked, unlike _on_gtk_changed.
+        self._text: Optional[str] = None
+        self.gui.get_buffer().connect("changed", self._invalidate_text)
+
+        # whether the line numbers are currently shown
+        self._multiline: Optional[bool] = None
+
         self._update_placeholder()
 
         self.gui.get_buffer().connect("changed", self._on_gtk_changed)
@@ -462,9 +581,24 @@ class CodeEditor:
         self.gui.connect("focus-out-event", self._update_placeholder)
         self._connect_message_listener()
 
+    def _invalidate_text(self, *_):
+        self._text = None
+
+    def _get_text(self) -> str:
+        """Get the text of the buffer, including the placeholder."""
+        if self._text is None:
+            buffer = self.gui.get_buffer()
+            self._text = buffer.get_text(
+                buffer.get_start_iter(),
+                buffer.get_end_iter(),
+                True,
+            )
+
+        return self._text
+
     def _update_placeholder(self, *_):
         buffer = self.gui.get_buffer()
-        code = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), True)
+        code = self._get_text()
 
         # test for incorrect states and fix them, without causing side effects
         with HandlerDisabled(buffer, self._on_gtk_changed):
@@ -481,9 +615,7 @@ class CodeEditor:
                 self.gui.get_style_context().remove_class("opaque-text")
 
     def _shows_placeholder(self):
-        buffer = self.gui.get_buffer()
-        code = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), True)
-        return code == self.placeholder
+        return self._get_text() == self.placeholder
 
     @property
     def code(self) -> str:
@@ -491,8 +623,7 @@ class CodeEditor:
         if self._shows_placeholder():
             return ""
 
-        buffer = self.gui.get_buffer()
-        return buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), True)
+        return self._get_text()
 
     @code.setter
     def code(self, code: str) -> None:
@@ -515,7 +646,14 @@ class CodeEditor:
 
     def _toggle_line_numbers(self):
         """Show line numbers if multiline, otherwise remove them."""
-        if "\n" in self.code:
+        # The placeholders are single lines, so the line count of the buffer
+        # tells if the code is multiline without having to search the text.
+        multiline = self.gui.get_buffer().get_line_count() > 1
+        if multiline == self._multiline:
+            return
+
+        self._multiline = multiline
+        if multiline:
             self.gui.set_show_line_numbers(True)
             # adds a bit of space between numbers and text:
             self.gui.set_show_line_marks(True)
@@ -610,6 +748,16 @@ class RequireActiveMapping:
         self._widget.set_opacity(0.5)
 
 
+def _swallow_key_press(_widget: Gtk.Widget, _event: Gdk.EventKey) -> bool:
+    return Gdk.EVENT_STOP
+
+
+def _set_sensitive(widget: Gtk.Widget, sensitive: bool):
+    """Make the widget insensitive and dim it, or the opposite."""
+    widget.set_sensitive(sensitive)
+    widget.set_opacity(1 if sensitive else 0.5)
+
+
 class RecordingToggle:
     """The toggle that starts input recording for the active_mapping."""
 
@@ -627,7 +775,7 @@ class RecordingToggle:
         # Don't leave the input when using arrow keys or tab. wait for the
         # window to consume the keycode from the reader. I.e. a tab input should
         # be recorded, instead of causing the recording to stop.
-        toggle.connect("key-press-event", lambda *args: Gdk.EVENT_STOP)
+        toggle.connect("key-press-event", _swallow_key_press)
         self._message_broker.subscribe(
             MessageType.recording_finished,
             self._on_recording_finished,
@@ -711,6 +859,8 @@ class LinkGameDropdown:
         self._controller = controller
         self._gui = gui
         self._game_ids: Set[str] = set()
+        # what the model currently contains, None if it contains anything else
+        self._games: Optional[Tuple[Tuple[str, str], ...]] = None
 
         self._populate()
         self._gui.connect("changed", self._on_gtk_changed)
@@ -721,17 +871,22 @@ class LinkGameDropdown:
         self._populate()
 
     def _populate(self):
-        self._gui.remove_all()
-        self._game_ids = set()
-
-        self._gui.append("none", _("No Game"))
-        self._game_ids.add("none")
-
-        for appid, name in get_steam_installed_games():
-            self._gui.append(appid, name)
-            self._game_ids.add(appid)
+        games = tuple(get_steam_installed_games())
 
         with HandlerDisabled(self._gui, self._on_gtk_changed):
+            if games != self._games:
+                # Fill a new model and swap it in once, instead of appending to
+                # the one that is attached to the dropdown row by row. Same
+                # columns as the model of Gtk.ComboBoxText: text and id.
+                store = Gtk.ListStore(str, str)
+                store.append([_("No Game"), "none"])
+                for appid, name in games:
+                    store.append([name, appid])
+
+                self._gui.set_model(store)
+                self._game_ids = {"none", *(appid for appid, name in games)}
+                self._games = games
+
             self._gui.set_active_id("none")
 
     def _on_preset_changed(self, data: PresetData):
@@ -739,6 +894,7 @@ class LinkGameDropdown:
         if desired not in self._game_ids and desired != "none":
             self._gui.append(desired, _("Unknown Game (%s)") % desired)
             self._game_ids.add(desired)
+            self._games = None
 
         with HandlerDisabled(self._gui, self._on_gtk_changed):
             self._gui.set_active_id(desired)
@@ -753,14 +909,80 @@ class LinkGameDropdown:
             self._controller.set_game_binding(game_id)
 
 
+# starttime, whether the process belongs to another user, what identifies the
+# program it runs and the inspection result of a process
+_PidCacheEntry = Tuple[int, bool, Optional[Tuple[str, ...]], Optional[dict]]
+
+
 class SteamProcessWatcher:
     """Scan running processes and attempt to detect Steam games."""
 
+    _generic_shortcut_tokens = frozenset(
+        (
+            "flatpak",
+            "run",
+            "%command%",
+            "/usr/bin",
+            "/usr/bin/flatpak",
+            "/usr/bin/env",
+            "bash",
+            "sh",
+        )
+    )
+    _shortcut_wrappers = frozenset(("bash", "sh", "dash", "env", "flatpak", "bwrap"))
+    _proc = "/proc"
+    # PF_KTHREAD in the flags of /proc/<pid>/stat
+    _kernel_thread_flag = 0x00200000
+    _compatdata_pattern = re.compile(r"compatdata[\\/](\d+)")
+    _env_appid_keys = ("SteamAppId", "SteamAppID", "STEAM_APP_ID", "SteamGameId")
+    _compat_appid_keys = ("STEAM_COMPAT_APP_ID", "STEAM_COMPAT_DATA_PATH")
+    _flatpak_keys = ("FLATPAK_ID", "FLATPAK_SANDBOX_DIR", "container")
+    # The only environment variables that are looked at, and how to find them
+    # in /proc/<pid>/environ
+    _environ_needles = tuple(
+        (key, b"\0" + key.encode() + b"=")
+        for key in (*_env_appid_keys, *_compat_appid_keys, *_flatpak_keys)
+    )
+    # All the ways an appid may be passed on the command line, most important
+    # first. -steamAppId and -gameId are covered by ignoring the case.
+    _cmd_appid_patterns = tuple(
+        re.compile(pattern, re.IGNORECASE)
+        for pattern in (
+            r"SteamAppId[=:\s]+(\d+)",
+            r"STEAM_APP_ID[=:\s]+(\d+)",
+            r"steam_appid[=:\s]+(\d+)",
+            r"-steamappid[=:\s]+(\d+)",
+            r"--appid[=:\s]+(\d+)",
+            r"-appid[=:\s]+(\d+)",
+            r"--app-id[=:\s]+(\d+)",
+            r"-app-id[=:\s]+(\d+)",
+            r"-gameid[=:\s]+(\d+)",
+            r"rungameid[=/](\d+)",
+        )
+    )
+    # All of the above in one regex. Most command lines contain none of them,
+    # which this tells with a single scan.
+    _cmd_appid_any_pattern = re.compile(
+        r"(?:"
+        r"(?:SteamAppId|STEAM_APP_ID|steam_appid|-steamappid"
+        r"|--?appid|--?app-id|-gameid)"
+        r"[=:\s]+"
+        r"|rungameid[=/]"
+        r")(\d+)",
+        re.IGNORECASE,
+    )
+
     def __init__(self, on_change: Optional[Callable[[List[str]], None]] = None):
         self._ticks = 0
         self._last = None
         self._last_hits: List[dict] = []
         self._on_change = on_change
+        self._uid = os.getuid()
+        # pid -> (starttime, foreign, key, info) of the previous tick. The key is
+        # (exe, cwd) of own processes and the cmdline of processes of other users,
+        # and None for processes that are never inspected again, like kernel
+        # threads.
+        self._pid_cache: Dict[int, _PidCacheEntry] = {}
         self._games = get_steam_installed_game_paths()
         self._shortcuts = get_steam_shortcuts()
         self._paths = []
@@ -785,6 +1007,21 @@ class SteamProcessWatcher:
             logger.info("GAME_WATCHER shortcuts loaded=%s", len(self._shortcuts))
         # Longest paths first to reduce false positives.
         self._paths.sort(key=lambda item: len(item[0]), reverse=True)
+        # Look up install paths by the directories of exe and cwd, and find them
+        # in the cmdline with a single regex, instead of testing each path.
+        self._appid_by_path: Dict[str, str] = {}
+        for base, appid, _name in self._paths:
+            self._appid_by_path.setdefault(base, appid)
+        # for str.startswith, which tests all of them in one call
+        self._path_prefixes = tuple(self._appid_by_path)
+        self._path_pattern = None
+        if self._paths:
+            # Like for exe and cwd, only whole directory names match
+            self._path_pattern = re.compile(
+                "(?:"
+                + "|".join(re.escape(base) for base, _appid, _name in self._paths)
+                + r")(?![^/\s])"
+            )
         self._log_debug_kv(
             "init games",
             {"count": len(self._games), "games": self._games},
@@ -793,12 +1030,19 @@ class SteamProcessWatcher:
             "init shortcuts",
             {"count": len(self._shortcuts), "shortcuts": self._shortcuts},
         )
-        GLib.timeout_add(1000, self._poll)
+        # The proc connector of netlink would report new processes without
+        # polling, but it requires CAP_NET_ADMIN, which the GUI doesn't have.
+        # Second granularity allows glib to wake up together with other timers.
+        GLib.timeout_add_seconds(1, self._poll)
 
     def _log_debug(self, message: str, *args):
         logger.debug("GAME_WATCHER_DEBUG " + message, *args)
 
     def _log_debug_kv(self, label: str, mapping: dict):
+        if not logger.isEnabledFor(logging.DEBUG):
+            # don't format all the reprs for nothing
+            return
+
         try:
             parts = []
             for key, value in mapping.items():
@@ -810,10 +1054,17 @@ class SteamProcessWatcher:
     def _poll(self):
         self._ticks += 1
         hits = []
+        pids = set()
         for pid in self._list_pids():
-            info = self._inspect_pid(pid)
-            if info.get("matches"):
+            pids.add(pid)
+            info = self._inspect_pid_cached(pid)
+            if info is not None and info.get("matches"):
                 hits.append(info)
+
+        for pid in self._pid_cache.keys() - pids:
+            # the process exited
+            del self._pid_cache[pid]
+
         current_appids = sorted(
             {
                 match["appid"]
@@ -949,20 +1200,10 @@ class SteamProcessWatcher:
         return ""
 
     def _is_generic_shortcut_token(self, token: str) -> bool:
-        generic = {
-            "flatpak",
-            "run",
-            "%command%",
-            "/usr/bin",
-            "/usr/bin/flatpak",
-            "/usr/bin/env",
-            "bash",
-            "sh",
-        }
         token = token.strip()
         if not token:
             return True
-        if token in generic:
+        if token in self._generic_shortcut_tokens:
             return True
         if token.startswith("-"):
             return True
@@ -972,29 +1213,128 @@ class SteamProcessWatcher:
 
     def _list_pids(self):
         try:
-            for entry in os.listdir("/proc"):
-                if entry.isdigit():
-                    yield int(entry)
+            with os.scandir(self._proc) as entries:
+                for entry in entries:
+                    if entry.name.isdigit():
+                        yield int(entry.name)
         except Exception as exc:
             self._log_debug_kv("proc list error", {"error": exc})
 
-    def _inspect_pid(self, pid: int) -> dict:
-        exe = self._safe_readlink(f"/proc/{pid}/exe")
-        cwd = self._safe_readlink(f"/proc/{pid}/cwd")
-        cmdline = self._safe_read_cmdline(f"/proc/{pid}/cmdline")
-        env = self._safe_read_environ(f"/proc/{pid}/environ")
+    def _inspect_pid_cached(self, pid: int) -> Optional[dict]:
+        """Inspect the process, or reuse the result of the previous tick.
+
+        The environment of a process doesn't change after it started, so only
+        processes that are new, exec'd another program, or changed their
+        directory are inspected again. For processes of other users, only a
+        changed cmdline tells that. The start time of the process tells a
+        reused pid apart. Returns None for processes that can't be games.
+        """
+        stat = self._safe_read_stat(pid)
+        if stat is None:
+            self._pid_cache.pop(pid, None)
+            return None
+
+        state, flags, starttime = stat
+        cached = self._pid_cache.get(pid)
+        if cached is not None and cached[0] != starttime:
+            # the pid was reused by another process since the previous tick
+            cached = None
+
+        if cached is None:
+            if flags & self._kernel_thread_flag:
+                # kernel threads stay kernel threads, never look at them again
+                self._pid_cache[pid] = (starttime, False, None, None)
+                return None
+
+            if state == "Z":
+                return None
+
+            foreign = not self._is_own_process(pid)
+        elif cached[2] is None:
+            return cached[3]
+        else:
+            foreign = cached[1]
+
+        proc_dir = f"{self._proc}/{pid}"
+        if foreign:
+            # Links and environment of processes of other users can't be read
+            # anyway, only the cmdline. It changes when the process exec's a game.
+            cmdline = self._safe_read_cmdline(f"{proc_dir}/cmdline")
+            key = tuple(cmdline)
+        else:
+            key = (
+                self._safe_readlink(f"{proc_dir}/exe"),
+                self._safe_readlink(f"{proc_dir}/cwd"),
+            )
+
+        if cached is not None and cached[2] == key:
+            return cached[3]
+
+        if foreign:
+            info = self._inspect_pid(
+                pid, exe="", cwd="", read_environ=False, cmdline=cmdline
+            )
+        else:
+            info = self._inspect_pid(pid, *key)
+
+        self._pid_cache[pid] = (starttime, foreign, key, info)
+        return info
+
+    def _safe_read_stat(self, pid: int) -> Optional[Tuple[str, int, int]]:
+        """Get the state, flags and starttime of the process."""
+        try:
+            with open(f"{self._proc}/{pid}/stat", "rb") as handle:
+                data = handle.read()
+            # The command name in parentheses may contain spaces and parentheses
+            fields = data[data.rindex(b")") + 2 :].split()
+            return fields[0].decode(), int(fields[6]), int(fields[19])
+        except Exception:
+            return None
+
+    def _is_own_process(self, pid: int) -> bool:
+        if self._uid == 0:
+            return True
+
+        try:
+            return os.stat(f"{self._proc}/{pid}").st_uid == self._uid
+        except OSError:
+            return False
+
+    def _inspect_pid(
+        self,
+        pid: int,
+        exe: Optional[str] = None,
+        cwd: Optional[str] = None,
+        read_environ: bool = True,
+        cmdline: Optional[List[str]] = None,
+    ) -> dict:
         matches = []
-        cmd_text = " ".join(cmdline)
+        if cmdline is None:
+            cmdline = self._safe_read_cmdline(f"{self._proc}/{pid}/cmdline")
+        if not cmdline:
+            # Kernel threads and zombies. Nothing to match against, so skip
+            # reading their links and environment.
+            return {
+                "pid": pid,
+                "exe": "",
+                "cwd": "",
+                "matches": matches,
+                "appid": None,
+                "name": "",
+            }
 
-        appid_env = self._get_env_appid(env)
-        if appid_env:
-            matches.append(("env", appid_env))
+        if exe is None:
+            exe = self._safe_readlink(f"{self._proc}/{pid}/exe")
+        if cwd is None:
+            cwd = self._safe_readlink(f"{self._proc}/{pid}/cwd")
+        env = {}
+        if read_environ:
+            env = self._safe_read_environ(f"{self._proc}/{pid}/environ")
+        cmd_text = " ".join(cmdline)
 
-        compat_appid = self._get_compat_appid(env)
-        if compat_appid:
-            matches.append(("compat", compat_appid))
+        matches.extend(self._get_environ_matches(env))
 
-        cmd_appid = self._get_cmd_appid(cmdline)
+        cmd_appid = self._get_cmd_appid(cmd_text)
         if cmd_appid:
             matches.append(("cmdline", cmd_appid))
 
@@ -1036,22 +1376,53 @@ class SteamProcessWatcher:
             return []
 
     def _safe_read_environ(self, path: str):
+        """Read the relevant variables of the environment.
+
+        Instead of splitting the whole environment into variables and decoding
+        all of them, only the few known keys are searched for. If a key appears
+        more than once, the last value wins, like it would in a dict.
+        """
         try:
             with open(path, "rb") as handle:
-                raw = handle.read().split(b"\0")
-            env = {}
-            for item in raw:
-                if b"=" not in item:
-                    continue
-                key, value = item.split(b"=", 1)
-                env[key.decode("utf-8", "ignore")] = value.decode("utf-8", "ignore")
-            return env
+                # the leading null-byte allows finding the first variable
+                raw = b"\0" + handle.read()
         except Exception:
             return {}
 
+        env = {}
+        for key, needle in self._environ_needles:
+            start = raw.rfind(needle)
+            if start == -1:
+                continue
+
+            start += len(needle)
+            end = raw.find(b"\0", start)
+            if end == -1:
+                end = len(raw)
+
+            env[key] = raw[start:end].decode("utf-8", "ignore")
+
+        return env
+
+    def _get_environ_matches(self, env: dict) -> List[Tuple[str, str]]:
+        """Get the appids of the "env" and "compat" variables of the process."""
+        matches: List[Tuple[str, str]] = []
+        if not env:
+            # most processes don't have any of the variables
+            return matches
+
+        appid_env = self._get_env_appid(env)
+        if appid_env:
+            matches.append(("env", appid_env))
+
+        compat_appid = self._get_compat_appid(env)
+        if compat_appid:
+            matches.append(("compat", compat_appid))
+
+        return matches
+
     def _get_env_appid(self, env: dict) -> str:
-        keys = ["SteamAppId", "SteamAppID", "STEAM_APP_ID", "SteamGameId"]
-        for key in keys:
+        for key in self._env_appid_keys:
             value = env.get(key)
             if value and value.isdigit():
                 try:
@@ -1069,33 +1440,21 @@ class SteamProcessWatcher:
         return ""
 
     def _get_compat_appid(self, env: dict) -> str:
-        for key in ["STEAM_COMPAT_APP_ID", "STEAM_COMPAT_DATA_PATH"]:
+        for key in self._compat_appid_keys:
             value = env.get(key, "")
             if value.isdigit():
                 return value
-            match = re.search(r"compatdata[\\/](\d+)", value)
+            match = self._compatdata_pattern.search(value)
             if match:
                 return match.group(1)
         return ""
 
-    def _get_cmd_appid(self, cmdline: list) -> str:
-        text = " ".join(cmdline)
-        patterns = [
-            r"SteamAppId[=:\s]+(\d+)",
-            r"STEAM_APP_ID[=:\s]+(\d+)",
-            r"steam_appid[=:\s]+(\d+)",
-            r"-steamappid[=:\s]+(\d+)",
-            r"-steamAppId[=:\s]+(\d+)",
-            r"--appid[=:\s]+(\d+)",
-            r"-appid[=:\s]+(\d+)",
-            r"--app-id[=:\s]+(\d+)",
-            r"-app-id[=:\s]+(\d+)",
-            r"-gameid[=:\s]+(\d+)",
-            r"-gameId[=:\s]+(\d+)",
-            r"rungameid[=/](\d+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+    def _get_cmd_appid(self, cmd_text: str) -> str:
+        if not self._cmd_appid_any_pattern.search(cmd_text):
+            return ""
+
+        for pattern in self._cmd_appid_patterns:
+            match = pattern.search(cmd_text)
             if match:
                 value = match.group(1)
                 if value.isdigit() and int(value) == 0:
@@ -1112,16 +1471,44 @@ class SteamProcessWatcher:
         for text in (exe, cwd, cmd_text):
             if not text:
                 continue
-            match = re.search(r"compatdata[\\/](\d+)", text)
+            match = self._compatdata_pattern.search(text)
             if match:
                 return match.group(1)
-        for base, appid, _name in self._paths:
-            if exe and exe.startswith(base):
-                return appid
-            if cwd and cwd.startswith(base):
-                return appid
-            if cmd_text and base in cmd_text:
-                return appid
+
+        # The longest matching install path wins
+        best_base = ""
+        for path in (exe, cwd):
+            base = self._find_install_path(path)
+            if len(base) > len(best_base):
+                best_base = base
+
+        if cmd_text and self._path_pattern is not None:
+            if "\\" in cmd_text:
+                # Wine shows paths like Z:\home\user\...\common\Game\game.exe
+                cmd_text = cmd_text.replace("\\", "/")
+
+            for match in self._path_pattern.finditer(cmd_text):
+                if len(match.group()) > len(best_base):
+                    best_base = match.group()
+
+        return self._appid_by_path.get(best_base, "")
+
+    def _find_install_path(self, path: str) -> str:
+        """Get the install path that contains the path, if there is one."""
+        if not path or not path.startswith(self._path_prefixes):
+            # the usual case, no need to look at each parent directory
+            return ""
+
+        while path:
+            if path in self._appid_by_path:
+                return path
+
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+
+            path = parent
+
         return ""
 
     def _match_shortcut_appid(
@@ -1165,7 +1552,7 @@ class SteamProcessWatcher:
         if not expected:
             return True
 
-        wrappers = {"bash", "sh", "dash", "env", "flatpak", "bwrap"}
+        wrappers = self._shortcut_wrappers
         if expected.endswith(".sh"):
             # Script-based shortcuts should be matched by shell wrappers only.
             return exe_base in wrappers or exe_base == expected
@@ -1289,11 +1676,11 @@ class ReleaseCombinationSwitch:
         self._controller = controller
         self._gui = switch
 
-        self._gui.connect("state-set", self._on_gtk_toggle)
+        self._toggle_handler = self._gui.connect("state-set", self._on_gtk_toggle)
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_changed)
 
     def _on_mapping_changed(self, data: MappingData):
-        with HandlerDisabled(self._gui, self._on_gtk_toggle):
+        with HandlerDisabled(self._gui, self._toggle_handler):
             self._gui.set_active(data.release_combination_keys)
 
     def _on_gtk_toggle(self, *_):
@@ -1337,25 +1724,17 @@ class InputConfigEntry(Gtk.ListBoxRow):
         vbox.pack_end(down_btn, False, True, 0)
         hbox.pack_end(vbox, False, False, 0)
 
-        up_btn.connect(
-            "clicked",
-            lambda *_: self._controller.move_input_config_in_combination(
-                self.input_event, "up"
-            ),
-        )
-        down_btn.connect(
-            "clicked",
-            lambda *_: self._controller.move_input_config_in_combination(
-                self.input_event, "down"
-            ),
-        )
+        up_btn.connect("clicked", self._on_gtk_move, "up")
+        down_btn.connect("clicked", self._on_gtk_move, "down")
         self.add(hbox)
-        self.show_all()
 
         # only used in testing
         self._up_btn = up_btn
         self._down_btn = down_btn
 
+    def _on_gtk_move(self, _, direction: Literal["up", "down"]):
+        self._controller.move_input_config_in_combination(self.input_event, direction)
+
 
 class CombinationListbox:
     """The ListBox with all the events inside active_mapping.input_combination."""
@@ -1370,6 +1749,9 @@ class CombinationListbox:
         self._controller = controller
         self._gui = listbox
         self._combination: Optional[InputCombination] = None
+        self._rows_by_event: Dict[InputConfig, InputConfigEntry] = {}
+        # the rows in the order they are in the listbox
+        self._rows: List[InputConfigEntry] = []
 
         self._message_broker.subscribe(
             MessageType.mapping,
@@ -1383,34 +1765,72 @@ class CombinationListbox:
         self._gui.connect("row-selected", self._on_gtk_row_selected)
 
     def _select_row(self, event: InputEvent):
-        for row in self._gui.get_children():
-            if row.input_event == event:
-                self._gui.select_row(row)
+        row = self._rows_by_event.get(event)
+        if row is not None:
+            self._gui.select_row(row)
 
     def _on_mapping_changed(self, mapping: MappingData):
         if self._combination == mapping.input_combination:
             return
 
-        event_entries = self._gui.get_children()
-        for event_entry in event_entries:
-            self._gui.remove(event_entry)
-
         if self._controller.is_empty_mapping():
             self._combination = None
+            events = []
         else:
             self._combination = mapping.input_combination
-            for event in self._combination:
-                self._gui.insert(InputConfigEntry(event, self._controller), -1)
+            events = list(self._combination)
+
+        selected = self._gui.get_selected_row()
+
+        # reuse the rows of events that are still in the combination, and keep
+        # the rows that are already in the right place where they are.
+        old_rows = self._rows_by_event
+        self._rows_by_event = {}
+        rows = []
+        new_rows = []
+        for event in events:
+            row = old_rows.pop(event, None)
+            if row is None:
+                row = InputConfigEntry(event, self._controller)
+                new_rows.append(row)
+            self._rows_by_event[event] = row
+            rows.append(row)
+
+        unchanged = 0
+        for child, row in zip(self._rows, rows):
+            if child is not row:
+                break
+            unchanged += 1
+
+        for child in self._rows[unchanged:]:
+            self._gui.remove(child)
+
+        for row in rows[unchanged:]:
+            self._gui.insert(row, -1)
+
+        self._rows = rows
+
+        # show new rows only once they have a parent
+        for row in new_rows:
+            row.show_all()
+
+        # removing a row from the listbox unselects it, even if it is moved
+        if (
+            selected is not None
+            and self._rows_by_event.get(selected.input_event) is selected
+            and not selected.is_selected()
+        ):
+            with HandlerDisabled(self._gui, self._on_gtk_row_selected):
+                self._gui.select_row(selected)
 
     def _on_event_changed(self, event: InputEvent):
         with HandlerDisabled(self._gui, self._on_gtk_row_selected):
             self._select_row(event)
 
     def _on_gtk_row_selected(self, *_):
-        for row in self._gui.get_children():
-            if row.is_selected():
-                self._controller.load_input_config(row.input_event)
-                break
+        row = self._gui.get_selected_row()
+        if row is not None:
+            self._controller.load_input_config(row.input_event)
 
 
 class AnalogInputSwitch:
@@ -1426,21 +1846,20 @@ class AnalogInputSwitch:
         self._controller = controller
         self._gui = gui
         self._input_config: Optional[InputConfig] = None
+        self._sensitive: Optional[bool] = None
 
-        self._gui.connect("state-set", self._on_gtk_toggle)
+        self._toggle_handler = self._gui.connect("state-set", self._on_gtk_toggle)
         self._message_broker.subscribe(MessageType.selected_event, self._on_event)
 
     def _on_event(self, input_cfg: InputConfig):
-        with HandlerDisabled(self._gui, self._on_gtk_toggle):
+        with HandlerDisabled(self._gui, self._toggle_handler):
             self._gui.set_active(input_cfg.defines_analog_input)
             self._input_config = input_cfg
 
-        if input_cfg.type == EV_KEY:
-            self._gui.set_sensitive(False)
-            self._gui.set_opacity(0.5)
-        else:
-            self._gui.set_sensitive(True)
-            self._gui.set_opacity(1)
+        sensitive = input_cfg.type != EV_KEY
+        if sensitive != self._sensitive:
+            self._sensitive = sensitive
+            _set_sensitive(self._gui, sensitive)
 
     def _on_gtk_toggle(self, *_):
         self._controller.set_event_as_analog(self._gui.get_active())
@@ -1460,27 +1879,30 @@ class TriggerThresholdInput:
         self._controller = controller
         self._gui = gui
         self._input_config: Optional[InputConfig] = None
+        self._sensitive: Optional[bool] = None
+        self._range: Optional[Tuple[int, int]] = None
 
         self._gui.set_increments(1, 1)
-        self._gui.connect("value-changed", self._on_gtk_changed)
+        self._changed_handler = self._gui.connect("value-changed", self._on_gtk_changed)
         self._message_broker.subscribe(MessageType.selected_event, self._on_event)
 
     def _on_event(self, input_config: InputConfig):
-        if input_config.type == EV_KEY:
-            self._gui.set_sensitive(False)
-            self._gui.set_opacity(0.5)
-        elif input_config.type == EV_ABS:
-            self._gui.set_sensitive(True)
-            self._gui.set_opacity(1)
-            self._gui.set_range(-99, 99)
-        else:
-            self._gui.set_sensitive(True)
-            self._gui.set_opacity(1)
-            self._gui.set_range(-999, 999)
-
-        with HandlerDisabled(self._gui, self._on_gtk_changed):
-            self._gui.set_value(input_config.analog_threshold or 0)
-            self._input_config = input_config
+        sensitive = input_config.type != EV_KEY
+        if sensitive != self._sensitive:
+            self._sensitive = sensitive
+            _set_sensitive(self._gui, sensitive)
+
+        if sensitive:
+            range_ = (-99, 99) if input_config.type == EV_ABS else (-999, 999)
+            if range_ != self._range:
+                self._range = range_
+                self._gui.set_range(*range_)
+
+        self._input_config = input_config
+        value = input_config.analog_threshold or 0
+        if self._gui.get_value() != value:
+            with HandlerDisabled(self._gui, self._changed_handler):
+                self._gui.set_value(value)
 
     def _on_gtk_changed(self, *_):
         self._controller.update_input_config(
@@ -1500,22 +1922,22 @@ class ReleaseTimeoutInput:
         self._message_broker = message_broker
         self._controller = controller
         self._gui = gui
+        self._sensitive: Optional[bool] = None
 
         self._gui.set_increments(0.01, 0.01)
         self._gui.set_range(0, 2)
-        self._gui.connect("value-changed", self._on_gtk_changed)
+        self._changed_handler = self._gui.connect("value-changed", self._on_gtk_changed)
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_message)
 
     def _on_mapping_message(self, mapping: MappingData):
-        if EV_REL in [event.type for event in mapping.input_combination]:
-            self._gui.set_sensitive(True)
-            self._gui.set_opacity(1)
-        else:
-            self._gui.set_sensitive(False)
-            self._gui.set_opacity(0.5)
+        sensitive = mapping.input_combination.has_rel_input
+        if sensitive != self._sensitive:
+            self._sensitive = sensitive
+            _set_sensitive(self._gui, sensitive)
 
-        with HandlerDisabled(self._gui, self._on_gtk_changed):
-            self._gui.set_value(mapping.release_timeout)
+        if self._gui.get_value() != mapping.release_timeout:
+            with HandlerDisabled(self._gui, self._changed_handler):
+                self._gui.set_value(mapping.release_timeout)
 
     def _on_gtk_changed(self, *_):
         self._controller.update_mapping(release_timeout=self._gui.get_value())
@@ -1533,25 +1955,24 @@ class RelativeInputCutoffInput:
         self._message_broker = message_broker
         self._controller = controller
         self._gui = gui
+        self._sensitive: Optional[bool] = None
 
         self._gui.set_increments(1, 1)
         self._gui.set_range(1, 1000)
-        self._gui.connect("value-changed", self._on_gtk_changed)
+        self._changed_handler = self._gui.connect("value-changed", self._on_gtk_changed)
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_message)
 
     def _on_mapping_message(self, mapping: MappingData):
-        if (
-            EV_REL in [event.type for event in mapping.input_combination]
-            and mapping.output_type == EV_ABS
-        ):
-            self._gui.set_sensitive(True)
-            self._gui.set_opacity(1)
-        else:
-            self._gui.set_sensitive(False)
-            self._gui.set_opacity(0.5)
+        sensitive = (
+            mapping.input_combination.has_rel_input and mapping.output_type == EV_ABS
+        )
+        if sensitive != self._sensitive:
+            self._sensitive = sensitive
+            _set_sensitive(self._gui, sensitive)
 
-        with HandlerDisabled(self._gui, self._on_gtk_changed):
-            self._gui.set_value(mapping.rel_to_abs_input_cutoff)
+        if self._gui.get_value() != mapping.rel_to_abs_input_cutoff:
+            with HandlerDisabled(self._gui, self._changed_handler):
+                self._gui.set_value(mapping.rel_to_abs_input_cutoff)
 
     def _on_gtk_changed(self, *_):
         self._controller.update_mapping(rel_xy_cutoff=self._gui.get_value())
@@ -1574,7 +1995,10 @@ class OutputAxisSelector:
         self._controller = controller
         self._gui = gui
         self._uinputs: Dict[str, Capabilities] = {}
-        self.model = Gtk.ListStore(str, str)
+        # id, name and (type, code) of each axis
+        self.model = Gtk.ListStore(str, str, object)
+        # the axes of each target, built when the target is selected the first time
+        self._models: Dict[Optional[str], Gtk.ListStore] = {}
 
         self._current_target: Optional[str] = None
 
@@ -1584,7 +2008,7 @@ class OutputAxisSelector:
         self._gui.add_attribute(renderer_text, "text", 1)
         self._gui.set_id_column(0)
 
-        self._gui.connect("changed", self._on_gtk_select_axis)
+        self._select_handler = self._gui.connect("changed", self._on_gtk_select_axis)
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_message)
         self._message_broker.subscribe(MessageType.uinputs, self._on_uinputs_message)
 
@@ -1592,38 +2016,52 @@ class OutputAxisSelector:
         if target == self._current_target:
             return
 
-        self.model.clear()
-        self.model.append(["None, None", _("No Axis")])
+        model = self._models.get(target)
+        if model is None:
+            model = self._build_model(target)
+            self._models[target] = model
+
+        self.model = model
+        self._gui.set_model(model)
+        self._current_target = target
+
+    def _build_model(self, target: Optional[str]) -> Gtk.ListStore:
+        model = Gtk.ListStore(str, str, object)
+        model.append(["None, None", _("No Axis"), (None, None)])
 
         if target is not None:
             capabilities = self._uinputs.get(target) or defaultdict(list)
-            types_codes = [
-                (EV_ABS, code) for code, absinfo in capabilities.get(EV_ABS) or ()
-            ]
-            types_codes.extend(
-                (EV_REL, code) for code in capabilities.get(EV_REL) or ()
-            )
-            for type_, code in types_codes:
-                key_name = get_evdev_constant_name(type_, code)
-                if isinstance(key_name, list):
-                    key_name = key_name[0]
-                self.model.append([f"{type_}, {code}", key_name])
+            for code, absinfo in capabilities.get(EV_ABS) or ():
+                self._append_axis(model, EV_ABS, code)
+            for code in capabilities.get(EV_REL) or ():
+                self._append_axis(model, EV_REL, code)
 
-        self._current_target = target
+        return model
+
+    @staticmethod
+    def _append_axis(model: Gtk.ListStore, type_: int, code: int):
+        key_name = get_evdev_constant_name(type_, code)
+        if isinstance(key_name, list):
+            key_name = key_name[0]
+        model.append([f"{type_}, {code}", key_name, (type_, code)])
 
     def _on_mapping_message(self, mapping: MappingData):
-        with HandlerDisabled(self._gui, self._on_gtk_select_axis):
+        with HandlerDisabled(self._gui, self._select_handler):
             self._set_model(mapping.target_uinput)
             self._gui.set_active_id(f"{mapping.output_type}, {mapping.output_code}")
 
     def _on_uinputs_message(self, uinputs: UInputsData):
+        if uinputs.uinputs != self._uinputs:
+            self._models = {}
+
         self._uinputs = uinputs.uinputs
 
     def _on_gtk_select_axis(self, *_):
-        if self._gui.get_active_id() == "None, None":
-            type_code = (None, None)
-        else:
-            type_code = tuple(int(i) for i in self._gui.get_active_id().split(","))
+        iter_ = self._gui.get_active_iter()
+        if iter_ is None:
+            return
+
+        type_code = self.model[iter_][2]
         self._controller.update_mapping(
             output_type=type_code[0], output_code=type_code[1]
         )
@@ -1661,17 +2099,19 @@ class KeyAxisStackSwitcher:
             active = self._key_macro_toggle
             inactive = self._analog_toggle
 
-        with HandlerDisabled(active, self._on_gtk_toggle):
-            active.set_active(True)
-        with HandlerDisabled(inactive, self._on_gtk_toggle):
-            inactive.set_active(False)
+        if not active.get_active():
+            with HandlerDisabled(active, self._on_gtk_toggle):
+                active.set_active(True)
+
+        if inactive.get_active():
+            with HandlerDisabled(inactive, self._on_gtk_toggle):
+                inactive.set_active(False)
 
     def _on_mapping_message(self, mapping: MappingData):
         # fist check the actual mapping
         if mapping.mapping_type == MappingType.ANALOG.value:
             self._set_active(MappingType.ANALOG.value)
-
-        if mapping.mapping_type == MappingType.KEY_MACRO.value:
+        elif mapping.mapping_type == MappingType.KEY_MACRO.value:
             self._set_active(MappingType.KEY_MACRO.value)
 
     def _on_gtk_toggle(self, btn: Gtk.ToggleButton):
@@ -1704,41 +2144,66 @@ class TransformationDrawArea:
         self._gui = gui
 
         self._transformation: Callable[[Union[float, int]], float] = lambda x: x
+        # the graph between 0 and 1. Only a new mapping changes it, not each
+        # expose event.
+        self._points: Optional[List[Tuple[float, float]]] = None
+        # deadzone, gain and expo of the current transformation
+        self._parameters: Optional[Tuple[float, float, float]] = None
 
         self._gui.connect("draw", self._on_gtk_draw)
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_message)
 
     def _on_mapping_message(self, mapping: MappingData):
-        self._transformation = Transformation(
-            100, -100, mapping.deadzone, mapping.gain, mapping.expo
-        )
+        parameters = (mapping.deadzone, mapping.gain, mapping.expo)
+        if parameters == self._parameters:
+            # something else of the mapping changed, the graph stays the same
+            return
+
+        self._parameters = parameters
+        self._transformation = Transformation(100, -100, *parameters)
+        self._points = None
         self._gui.queue_draw()
 
+    def _get_points(self) -> List[Tuple[float, float]]:
+        if self._points is None:
+            self._points = [
+                (x / 200 + 0.5, -0.5 * self._transformation(x) + 0.5)
+                # leave some space left and right for the lineCap to be visible
+                for x in range(-97, 97)
+            ]
+
+        return self._points
+
     def _on_gtk_draw(self, _, context: cairo.Context):
-        points = [
-            (x / 200 + 0.5, -0.5 * self._transformation(x) + 0.5)
-            # leave some space left and right for the lineCap to be visible
-            for x in range(-97, 97)
-        ]
         width = self._gui.get_allocated_width()
         height = self._gui.get_allocated_height()
         b = min((width, height))
-        scaled_points = [(x * b, y * b) for x, y in points]
+        if b <= 0:
+            return
+
+        points = self._get_points()
+
+        # Paths are stored in device space, so the points are scaled by cairo
+        # while they are added. Restore the transformation before stroking, to
+        # keep the line widths in pixels.
+        context.save()
+        context.scale(b, b)
 
         # x arrow
-        context.move_to(0 * b, 0.5 * b)
-        context.line_to(1 * b, 0.5 * b)
-        context.line_to(0.96 * b, 0.52 * b)
-        context.move_to(1 * b, 0.5 * b)
-        context.line_to(0.96 * b, 0.48 * b)
+        context.move_to(0, 0.5)
+        context.line_to(1, 0.5)
+        context.line_to(0.96, 0.52)
+        context.move_to(1, 0.5)
+        context.line_to(0.96, 0.48)
 
         # y arrow
-        context.move_to(0.5 * b, 1 * b)
-        context.line_to(0.5 * b, 0)
-        context.line_to(0.48 * b, 0.04 * b)
-        context.move_to(0.5 * b, 0)
-        context.line_to(0.52 * b, 0.04 * b)
+        context.move_to(0.5, 1)
+        context.line_to(0.5, 0)
+        context.line_to(0.48, 0.04)
+        context.move_to(0.5, 0)
+        context.line_to(0.52, 0.04)
 
+        context.restore()
         context.set_line_width(2)
         arrow_color = Gdk.RGBA(0.5, 0.5, 0.5, 0.2)
         context.set_source_rgba(
@@ -1750,10 +2215,13 @@ class TransformationDrawArea:
         context.stroke()
 
         # graph
-        context.move_to(*scaled_points[0])
-        for scaled_point in scaled_points[1:]:
+        context.save()
+        context.scale(b, b)
+        context.move_to(*points[0])
+        for point in points[1:]:
             # Ploting point
-            context.line_to(*scaled_point)
+            context.line_to(*point)
+        context.restore()
 
         line_color = Colors.get_accent_color()
         context.set_line_width(3)
@@ -1790,20 +2258,29 @@ class Sliders:
         self._deadzone.set_range(0, 0.9)
         self._expo.set_range(-1, 1)
 
-        self._gain.connect("value-changed", self._on_gtk_gain_changed)
-        self._expo.connect("value-changed", self._on_gtk_expo_changed)
-        self._deadzone.connect("value-changed", self._on_gtk_deadzone_changed)
+        self._gain_handler = self._gain.connect(
+            "value-changed", self._on_gtk_gain_changed
+        )
+        self._expo_handler = self._expo.connect(
+            "value-changed", self._on_gtk_expo_changed
+        )
+        self._deadzone_handler = self._deadzone.connect(
+            "value-changed", self._on_gtk_deadzone_changed
+        )
         self._message_broker.subscribe(MessageType.mapping, self._on_mapping_message)
 
     def _on_mapping_message(self, mapping: MappingData):
-        with HandlerDisabled(self._gain, self._on_gtk_gain_changed):
-            self._gain.set_value(mapping.gain)
+        if self._gain.get_value() != mapping.gain:
+            with HandlerDisabled(self._gain, self._gain_handler):
+                self._gain.set_value(mapping.gain)
 
-        with HandlerDisabled(self._expo, self._on_gtk_expo_changed):
-            self._expo.set_value(mapping.expo)
+        if self._expo.get_value() != mapping.expo:
+            with HandlerDisabled(self._expo, self._expo_handler):
+                self._expo.set_value(mapping.expo)
 
-        with HandlerDisabled(self._deadzone, self._on_gtk_deadzone_changed):
-            self._deadzone.set_value(mapping.deadzone)
+        if self._deadzone.get_value() != mapping.deadzone:
+            with HandlerDisabled(self._deadzone, self._deadzone_handler):
+                self._deadzone.set_value(mapping.deadzone)
 
     def _on_gtk_gain_changed(self, *_):
         self._controller.update_mapping(gain=self._gain.get_value())
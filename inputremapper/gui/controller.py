@@ -150,9 +150,13 @@ class Controller:
         """Load a mapping as soon as everyone got notified about the new preset."""
         if data.mappings:
             mappings = list(data.mappings)
+            # the same order as in the MappingListBox, so the top row is loaded
             mappings.sort(
                 key=lambda mapping: (
-                    mapping.format_name() or mapping.input_combination.beautify()
+                    mapping.input_combination == InputCombination.empty_combination(),
+                    (
+                        mapping.format_name() or mapping.input_combination.beautify()
+                    ).casefold(),
                 )
             )
             combination = mappings[0].input_combination
@@ -51,6 +51,9 @@ class MessageBroker:
 
     def __init__(self):
         self._listeners: Dict[MessageType, Set[MessageListener]] = defaultdict(set)
+        # the reverse of _listeners, so that unsubscribe only needs to look at
+        # the message types the listener is actually subscribed to
+        self._message_types: Dict[MessageListener, Set[MessageType]] = defaultdict(set)
         self._messages: Deque[Tuple[Message, str, int]] = deque()
         self._publishing = False
 
@@ -91,6 +94,7 @@ class MessageBroker:
         """Attach a listener to an event."""
         logger.debug("adding new Listener for %s: %s", massage_type, listener)
         self._listeners[massage_type].add(listener)
+        self._message_types[listener].add(massage_type)
         return self
 
     @staticmethod
@@ -100,11 +104,8 @@ class MessageBroker:
         return os.path.basename(tb.filename), tb.lineno or 0
 
     def unsubscribe(self, listener: MessageListener) -> None:
-        for listeners in self._listeners.values():
-            try:
-                listeners.remove(listener)
-            except KeyError:
-                pass
+        for message_type in self._message_types.pop(listener, ()):
+            self._listeners[message_type].discard(listener)
 
 
 class Signal:
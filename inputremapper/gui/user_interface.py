@@ -21,6 +21,7 @@
 """User Interface."""
 import os
 import subprocess
+import tempfile
 from typing import Dict, Callable, Tuple, Optional
 
 import gi
@@ -89,10 +90,7 @@ from inputremapper.gui.messages.message_broker import (
     MessageType,
 )
 from inputremapper.gui.messages.message_data import UserConfirmRequest
-from inputremapper.gui.utils import (
-    HandlerDisabled,
-    gtk_iteration,
-)
+from inputremapper.gui.utils import HandlerDisabled
 from inputremapper.injection.injector import InjectorStateMessage
 from inputremapper.logging.logger import (
     logger,
@@ -115,9 +113,29 @@ def on_close_about(about, _):
     return True
 
 
+VERSION_LABEL = f"input-remapper {VERSION} {COMMIT_HASH[:7]}" + (
+    f"\npython-evdev {EVDEV_VERSION}" if EVDEV_VERSION else ""
+)
+
 AUTOSTART_FILENAME = "input-remapper-gtk-autostart.desktop"
 AUTOSTART_HIDDEN_KEY = "X-Input-Remapper-AutoHidden"
 
+# buttons that only call a method of the controller without arguments
+CONTROLLER_BUTTONS = (
+    ("delete_preset", "delete_preset"),
+    ("copy_preset", "copy_preset"),
+    ("create_preset", "add_preset"),
+    ("apply_preset", "start_injecting"),
+    ("stop_injection_preset_page", "stop_injecting"),
+    ("stop_injection_editor_page", "stop_injecting"),
+    ("create_mapping_button", "create_mapping"),
+    ("delete-mapping", "delete_mapping"),
+    ("remove-event-btn", "remove_event"),
+)
+
+# checked for every key press in the window
+CONTROL_MASK = Gdk.ModifierType.CONTROL_MASK
+
 
 class TrayIcon:
     """System tray icon with basic show/quit actions."""
@@ -169,6 +187,8 @@ class TrayIcon:
 class UserInterface:
     """The input-remapper gtk window."""
 
+    _css_provider: Optional[Gtk.CssProvider] = None
+
     def __init__(
         self,
         message_broker: MessageBroker,
@@ -188,52 +208,64 @@ class UserInterface:
         # stores the ids for all the listeners attached to the gui
         self.gtk_listeners: Dict[Callable, int] = {}
 
+        # whether the buttons currently show an active injection
+        self._injector_active: Optional[bool] = None
+
+        # path -> ((mtime, size), (entries, disabled)) of the parsed autostart files
+        self._autostart_files: Dict[
+            str, Tuple[Tuple[int, int], Tuple[Dict[str, str], bool]]
+        ] = {}
+
         self.message_broker.subscribe(MessageType.terminate, lambda _: self.close())
 
         self.builder = Gtk.Builder()
+        # the objects of the builder never change, remember those that were used
+        self._widgets: Dict[str, GObject.Object] = {}
         self._build_ui()
         self.window: Gtk.Window = self.get("window")
         self.about: Gtk.Window = self.get("about-dialog")
         self.combination_editor: Gtk.Dialog = self.get("combination-editor")
+        # the about dialog is set up when it is opened the first time
+        self._about_set_up = False
 
-        self._create_dialogs()
         self._create_components()
         self._connect_gtk_signals()
         self._connect_message_listener()
         self._connect_settings_controls()
 
-        self.window.show()
-        # hide everything until stuff is populated
-        self.get("vertical-wrapper").set_opacity(0)
-        # if any of the next steps take a bit to complete, have the window
-        # already visible (without content) to make it look more responsive.
-        gtk_iteration()
-
-        # now show the proper finished content of the window
-        self.get("vertical-wrapper").set_opacity(1)
+        self._tray_icon: Optional[TrayIcon] = None
+        if os.environ.get("INPUT_REMAPPER_START_HIDDEN") == "1":
+            self.close()
+        else:
+            self.window.present()
+
+        # not needed to show the window, so don't let it delay the first paint
+        GLib.idle_add(self._finish_startup, priority=GLib.PRIORITY_LOW)
+
+    def _finish_startup(self) -> bool:
+        """Set up the tray icon and settings once the window is presented."""
         self._tray_icon = TrayIcon(self)
         self.sync_settings_toggles()
         # Drop any temporary polkit auth left by startup actions (e.g. reader start)
         # so enabling autostart can request authentication explicitly.
         self._revoke_polkit_temp_authorization()
-        if os.environ.get("INPUT_REMAPPER_START_HIDDEN") == "1":
-            self.close()
-        else:
-            self.window.present()
+        return False
 
     def _build_ui(self):
         """Build the window from stylesheet and gladefile."""
-        css_provider = Gtk.CssProvider()
-
-        with open(get_data_path("style.css"), "r") as file:
-            css_provider.load_from_data(bytes(file.read(), encoding="UTF-8"))
-
-        Gtk.StyleContext.add_provider_for_screen(
-            Gdk.Screen.get_default(),
-            css_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
-        )
+        if UserInterface._css_provider is None:
+            # the stylesheet applies to the whole screen, parse and add it only
+            # once, even if another window is created
+            css_provider = Gtk.CssProvider()
+            css_provider.load_from_path(get_data_path("style.css"))
+            Gtk.StyleContext.add_provider_for_screen(
+                Gdk.Screen.get_default(),
+                css_provider,
+                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
+            )
+            UserInterface._css_provider = css_provider
 
+        # add_from_file is needed to resolve the relative path of the about logo
         gladefile = get_data_path("input-remapper.glade")
         self.builder.add_from_file(gladefile)
         self.builder.connect_signals(self)
@@ -331,48 +363,25 @@ class UserInterface:
         autocompletion.set_relative_to(self.get("code_editor_container"))
         self.autocompletion = autocompletion  # only for testing
 
-    def _create_dialogs(self):
-        """Setup different dialogs, such as the about page."""
+    def _set_up_about_dialog(self):
+        """Connect the about dialog and fill in the versions."""
+        self._about_set_up = True
         self.about.connect("delete-event", on_close_about)
         # set_position needs to be done once initially, otherwise the
         # dialog is not centered when it is opened for the first time
         self.about.set_position(Gtk.WindowPosition.CENTER_ON_PARENT)
-        self.get("version-label").set_text(
-            f"input-remapper {VERSION} {COMMIT_HASH[:7]}"
-            f"\npython-evdev {EVDEV_VERSION}"
-            if EVDEV_VERSION
-            else ""
-        )
+        self.get("version-label").set_text(VERSION_LABEL)
 
     def _connect_gtk_signals(self):
-        self.get("delete_preset").connect(
-            "clicked", lambda *_: self.controller.delete_preset()
-        )
-        self.get("copy_preset").connect(
-            "clicked", lambda *_: self.controller.copy_preset()
-        )
-        self.get("create_preset").connect(
-            "clicked", lambda *_: self.controller.add_preset()
-        )
-        self.get("apply_preset").connect(
-            "clicked", lambda *_: self.controller.start_injecting()
-        )
-        self.get("stop_injection_preset_page").connect(
-            "clicked", lambda *_: self.controller.stop_injecting()
-        )
-        self.get("stop_injection_editor_page").connect(
-            "clicked", lambda *_: self.controller.stop_injecting()
-        )
+        for button, method_name in CONTROLLER_BUTTONS:
+            self.get(button).connect(
+                "clicked", self._on_gtk_controller_button, method_name
+            )
+
         self.get("rename-button").connect("clicked", self.on_gtk_rename_clicked)
         self.get("preset_name_input").connect(
             "key-release-event", self.on_gtk_preset_name_input_return
         )
-        self.get("create_mapping_button").connect(
-            "clicked", lambda *_: self.controller.create_mapping()
-        )
-        self.get("delete-mapping").connect(
-            "clicked", lambda *_: self.controller.delete_mapping()
-        )
         self.combination_editor.connect(
             # it only takes self as argument, but delete-events provides more
             # probably a gtk bug
@@ -382,11 +391,11 @@ class UserInterface:
         self.get("edit-combination-btn").connect(
             "clicked", lambda *_: self.combination_editor.show()
         )
-        self.get("remove-event-btn").connect(
-            "clicked", lambda *_: self.controller.remove_event()
-        )
         self.connect_shortcuts()
 
+    def _on_gtk_controller_button(self, _, method_name: str):
+        getattr(self.controller, method_name)()
+
     def _connect_message_listener(self):
         self.message_broker.subscribe(
             MessageType.mapping, self.update_combination_label
@@ -427,11 +436,11 @@ class UserInterface:
         )
 
         if self._settings_autostart_switch is not None:
-            self._settings_autostart_switch.connect(
+            self._settings_autostart_handler = self._settings_autostart_switch.connect(
                 "state-set", self._on_settings_autostart_toggled
             )
         if self._settings_autohide_switch is not None:
-            self._settings_autohide_switch.connect(
+            self._settings_autohide_handler = self._settings_autohide_switch.connect(
                 "state-set", self._on_settings_autohide_toggled
             )
         if self._settings_update_current_version is not None:
@@ -452,11 +461,15 @@ class UserInterface:
         autostart_enabled = self.get_autostart_enabled()
         autohide_enabled = self.get_autostart_hidden()
 
-        with HandlerDisabled(self._settings_autostart_switch, self._on_settings_autostart_toggled):
+        with HandlerDisabled(
+            self._settings_autostart_switch, self._settings_autostart_handler
+        ):
             self._settings_autostart_switch.set_active(autostart_enabled)
 
         if self._settings_autohide_switch is not None:
-            with HandlerDisabled(self._settings_autohide_switch, self._on_settings_autohide_toggled):
+            with HandlerDisabled(
+                self._settings_autohide_switch, self._settings_autohide_handler
+            ):
                 self._settings_autohide_switch.set_active(
                     autohide_enabled if autostart_enabled else False
                 )
@@ -543,7 +556,7 @@ class UserInterface:
         )
         response = dialog.run()
         remove_config = checkbox.get_active()
-        dialog.hide()
+        dialog.destroy()
         logger.info(
             "Settings uninstall dialog response=%s remove_config=%s",
             response,
@@ -583,7 +596,7 @@ class UserInterface:
                 _("Could not complete uninstall. Please check the logs for details.")
             )
             error_dialog.run()
-            error_dialog.hide()
+            error_dialog.destroy()
             return False
 
         logger.info("Uninstall command completed successfully")
@@ -618,7 +631,7 @@ class UserInterface:
         )
         response = dialog.run()
         dismissed = checkbox.get_active() and response == Gtk.ResponseType.ACCEPT
-        dialog.hide()
+        dialog.destroy()
 
         if dismissed:
             self.controller.data_manager.set_autohide_warning_dismissed(True)
@@ -648,34 +661,36 @@ class UserInterface:
     def _on_user_confirm_request(self, msg: UserConfirmRequest):
         # if the message contains a line-break, use the first chunk for the primary
         # message, and the rest for the secondary message.
-        chunks = msg.msg.split("\n")
-        primary = chunks[0]
-        secondary = " ".join(chunks[1:])
+        primary, _separator, rest = msg.msg.partition("\n")
+        secondary = rest.replace("\n", " ")
 
         message_dialog = self._create_dialog(primary, secondary)
 
         response = message_dialog.run()
         msg.respond(response == Gtk.ResponseType.ACCEPT)
 
-        message_dialog.hide()
+        message_dialog.destroy()
 
     def on_injector_state_msg(self, msg: InjectorStateMessage):
         """Update the ui to reflect the status of the injector."""
+        active = msg.active()
+        if active == self._injector_active:
+            return
+
+        self._injector_active = active
         stop_injection_preset_page: Gtk.Button = self.get("stop_injection_preset_page")
         stop_injection_editor_page: Gtk.Button = self.get("stop_injection_editor_page")
         recording_toggle: Gtk.ToggleButton = self.get("key_recording_toggle")
 
-        if msg.active():
+        stop_injection_preset_page.set_sensitive(True)
+        stop_injection_editor_page.set_sensitive(True)
+        if active:
             stop_injection_preset_page.set_opacity(1)
             stop_injection_editor_page.set_opacity(1)
-            stop_injection_preset_page.set_sensitive(True)
-            stop_injection_editor_page.set_sensitive(True)
             recording_toggle.set_opacity(0.5)
         else:
             stop_injection_preset_page.set_opacity(0.5)
             stop_injection_editor_page.set_opacity(0.5)
-            stop_injection_preset_page.set_sensitive(True)
-            stop_injection_editor_page.set_sensitive(True)
             recording_toggle.set_opacity(1)
 
     def disconnect_shortcuts(self):
@@ -697,7 +712,13 @@ class UserInterface:
 
     def get(self, name: str):
         """Get a widget from the window."""
-        return self.builder.get_object(name)
+        widget = self._widgets.get(name)
+        if widget is None:
+            widget = self.builder.get_object(name)
+            if widget is not None:
+                self._widgets[name] = widget
+
+        return widget
 
     def close(self):
         """Close the window."""
@@ -713,23 +734,24 @@ class UserInterface:
     def update_combination_label(self, mapping: MappingData):
         """Listens for mapping and updates the combination label."""
         label: Gtk.Label = self.get("combination-label")
-        if mapping.input_combination.beautify() == label.get_label():
-            return
         if mapping.input_combination == InputCombination.empty_combination():
             label.set_opacity(0.5)
             label.set_label(_("no input configured"))
             return
 
+        beautified = mapping.input_combination.beautify()
+        if beautified == label.get_label():
+            return
+
         label.set_opacity(1)
-        label.set_label(mapping.input_combination.beautify())
+        label.set_label(beautified)
 
     def on_gtk_shortcut(self, _, event: Gdk.EventKey):
         """Execute shortcuts."""
-        if event.state & Gdk.ModifierType.CONTROL_MASK:
-            try:
-                self.shortcuts[event.keyval]()
-            except KeyError:
-                pass
+        if event.state & CONTROL_MASK:
+            shortcut = self.shortcuts.get(event.keyval)
+            if shortcut is not None:
+                shortcut()
 
     def on_gtk_close(self, *_):
         self.close()
@@ -765,35 +787,51 @@ class UserInterface:
         except FileNotFoundError:
             return False
 
-    def _read_autostart_file(self, path: str) -> Dict[str, str]:
-        data: Dict[str, str] = {}
+    def _parse_autostart_file(self, path: str) -> Tuple[Dict[str, str], bool]:
+        """Get the entries of the file and whether it disables autostart.
+
+        The file is only parsed again if it changed since the last time. The
+        returned dict is shared, don't modify it.
+        """
         try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as handle:
-                for line in handle:
-                    if "=" not in line:
-                        continue
-                    key, value = line.strip().split("=", 1)
-                    data[key.strip()] = value.strip()
+            stat = os.stat(path)
         except OSError:
-            return {}
-        return data
+            self._autostart_files.pop(path, None)
+            return {}, False
 
-    def _autostart_file_disabled(self, path: str) -> bool:
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._autostart_files.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        data: Dict[str, str] = {}
+        disabled = False
         try:
             with open(path, "r", encoding="utf-8", errors="ignore") as handle:
                 for line in handle:
-                    if "=" not in line:
+                    key, separator, value = line.partition("=")
+                    if not separator:
                         continue
-                    key, value = line.strip().split("=", 1)
-                    key = key.strip().lower()
-                    value = value.strip().lower()
-                    if key == "hidden" and value == "true":
-                        return True
-                    if key == "x-gnome-autostart-enabled" and value == "false":
-                        return True
+                    key = key.strip()
+                    value = value.strip()
+                    data[key] = value
+
+                    lower_key = key.lower()
+                    if lower_key == "hidden":
+                        disabled = disabled or value.lower() == "true"
+                    elif lower_key == "x-gnome-autostart-enabled":
+                        disabled = disabled or value.lower() == "false"
         except OSError:
-            return False
-        return False
+            return {}, False
+
+        self._autostart_files[path] = (version, (data, disabled))
+        return data, disabled
+
+    def _read_autostart_file(self, path: str) -> Dict[str, str]:
+        return self._parse_autostart_file(path)[0]
+
+    def _autostart_file_disabled(self, path: str) -> bool:
+        return self._parse_autostart_file(path)[1]
 
     def get_autostart_enabled(self) -> bool:
         user_path = self._autostart_user_path()
@@ -878,7 +916,7 @@ class UserInterface:
         )
         response = dialog.run()
         dismissed = checkbox.get_active() and response == Gtk.ResponseType.ACCEPT
-        dialog.hide()
+        dialog.destroy()
 
         if dismissed:
             self.controller.data_manager.set_autostart_warning_dismissed(True)
@@ -922,11 +960,31 @@ class UserInterface:
         else:
             lines.append("Hidden=true")
             lines.append("X-GNOME-Autostart-enabled=false")
-        with open(path, "w", encoding="utf-8") as handle:
-            handle.write("\n".join(lines) + "\n")
+        # the mtime might not change if the file was read just before
+        self._autostart_files.pop(path, None)
+        # write the whole file at once and move it into place, so that the session
+        # never sees a partially written autostart entry
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=f".{AUTOSTART_FILENAME}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                # mkstemp creates the file with 0o600
+                os.fchmod(handle.fileno(), 0o644)
+                handle.write(("\n".join(lines) + "\n").encode("utf-8"))
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
 
     def on_gtk_about_clicked(self, _):
         """Show the about/help dialog."""
+        if not self._about_set_up:
+            self._set_up_about_dialog()
+
         self.about.show()
 
     def on_gtk_about_key_press(self, _, event):
@@ -21,7 +21,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import List, Callable, Dict, Optional
+from typing import List, Callable, Dict, Optional, Union
 
 from gi.repository import Gtk, GLib, Gdk
 
@@ -180,14 +180,19 @@ debounce_manager = DebounceManager()
 class HandlerDisabled:
     """Safely modify a widget without causing handlers to be called.
 
-    Use in a `with` statement.
+    Use in a `with` statement. The handler is either the connected function, or
+    the id returned by `connect`, which avoids searching for the handler.
     """
 
-    def __init__(self, widget: Gtk.Widget, handler: Callable):
+    def __init__(self, widget: Gtk.Widget, handler: Union[Callable, int]):
         self.widget = widget
         self.handler = handler
 
     def __enter__(self):
+        if isinstance(self.handler, int):
+            self.widget.handler_block(self.handler)
+            return
+
         try:
             self.widget.handler_block_by_func(self.handler)
         except TypeError as error:
@@ -196,6 +201,10 @@ class HandlerDisabled:
             logger.debug('HandlerDisabled entry skipped: "%s"', error)
 
     def __exit__(self, *_):
+        if isinstance(self.handler, int):
+            self.widget.handler_unblock(self.handler)
+            return
+
         try:
             self.widget.handler_unblock_by_func(self.handler)
         except TypeError as error:
@@ -41,14 +41,15 @@ class Transformation:
         self._cache: Dict[float, float] = {}
 
     def __call__(self, /, x: Union[int, float]) -> float:
-        if x not in self._cache:
+        y = self._cache.get(x)
+        if y is None:
             y = (
                 self._calc_qubic(self._flatten_deadzone(self._normalize(x)))
                 * self._gain
             )
             self._cache[x] = y
 
-        return self._cache[x]
+        return y
 
     def set_range(self, min_, max_):
         # TODO docstring
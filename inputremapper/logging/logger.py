@@ -20,12 +20,16 @@
 """Logging setup for input-remapper."""
 
 import logging
+import multiprocessing.util
 import os
 import pwd
 import shlex
+import signal
+import threading
 import time
-from logging.handlers import RotatingFileHandler
-from typing import cast
+import weakref
+from logging.handlers import MemoryHandler, RotatingFileHandler
+from typing import Optional, cast
 
 from inputremapper.logging.formatter import ColorfulFormatter
 
@@ -43,6 +47,8 @@ MONITOR_PATH_ENV = "INPUT_REMAPPER_MONITOR_PATH"
 MONITOR_DEFAULT_FILENAME = "pilot-monitor.log"
 MONITOR_MAX_BYTES = 20 * 1024 * 1024
 MONITOR_BACKUP_COUNT = 8
+MONITOR_BUFFER_CAPACITY = 1024
+MONITOR_FLUSH_INTERVAL = 30
 
 
 def _is_truthy(value: str) -> bool:
@@ -129,12 +135,158 @@ def _restore_user_ownership(path: str) -> None:
         pass
 
 
-def _create_monitor_handler(path: str) -> RotatingFileHandler:
+class _MonitorFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that flushes its stream once per batch of records."""
+
+    _deferring_flush = False
+
+    def flush(self) -> None:
+        if not self._deferring_flush:
+            super().flush()
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        self.acquire()
+        try:
+            self._deferring_flush = True
+            for record in records:
+                self.handle(record)
+        finally:
+            self._deferring_flush = False
+            self.release()
+
+        self.flush()
+
+
+class _MonitorMemoryHandler(MemoryHandler):
+    """Buffers monitor records and hands them to the file handler in batches.
+
+    Flushes when the buffer is full, on errors, and at the latest
+    MONITOR_FLUSH_INTERVAL seconds after a record was buffered, even if
+    nothing else is logged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._flush_interval = MONITOR_FLUSH_INTERVAL
+        # when the oldest buffered record has to be written at the latest
+        self._flush_deadline: Optional[float] = None
+        self._flushing = False
+        _monitor_handlers.add(self)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        if self.buffer and self._flush_deadline is None:
+            self._flush_deadline = time.monotonic() + self._flush_interval
+            _monitor_flusher.wake_up()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            # The SIGTERM handler can interrupt a flush of the same thread, whose
+            # records would otherwise be written twice
+            if self._flushing:
+                return
+
+            self._flushing = True
+            try:
+                self._flush_deadline = None
+                if self.target and self.buffer:
+                    self.target.handle_batch(self.buffer)
+                    self.buffer.clear()
+            finally:
+                self._flushing = False
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        _monitor_handlers.discard(self)
+        super().close()
+
+
+class _MonitorFlusher:
+    """One daemon thread that flushes the monitor handlers once they are due.
+
+    It sleeps until the next deadline, or without a timeout while nothing is
+    buffered, and is woken up when a handler buffers its first record.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wake_up(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="input-remapper-monitor-flusher",
+                    daemon=True,
+                )
+                self._thread.start()
+
+        self._wakeup.set()
+
+    def reset_after_fork(self) -> None:
+        """The thread doesn't exist in a forked child, start a new one when needed."""
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            timeout: Optional[float] = None
+            now = time.monotonic()
+            for handler in list(_monitor_handlers):
+                deadline = handler._flush_deadline
+                if deadline is None:
+                    continue
+
+                if deadline <= now:
+                    handler.flush()
+                elif timeout is None or deadline - now < timeout:
+                    timeout = deadline - now
+
+            self._wakeup.wait(timeout)
+
+
+# the monitor handlers of this process, for the flusher and the fork hooks
+_monitor_handlers: weakref.WeakSet[_MonitorMemoryHandler] = weakref.WeakSet()
+_monitor_flusher = _MonitorFlusher()
+
+
+def _flush_monitor_handlers() -> None:
+    for handler in list(_monitor_handlers):
+        handler.flush()
+
+
+def _after_fork_in_child() -> None:
+    _monitor_flusher.reset_after_fork()
+    for handler in list(_monitor_handlers):
+        if handler._flush_deadline is not None:
+            _monitor_flusher.wake_up()
+
+
+def _after_fork_in_multiprocessing_child(_flusher: _MonitorFlusher) -> None:
+    # multiprocessing children end with os._exit, which skips logging.shutdown
+    for handler in list(_monitor_handlers):
+        multiprocessing.util.Finalize(handler, handler.flush, exitpriority=0)
+
+
+# A forked child would write the pending records of its parent a second time
+os.register_at_fork(before=_flush_monitor_handlers, after_in_child=_after_fork_in_child)
+multiprocessing.util.register_after_fork(
+    _monitor_flusher, _after_fork_in_multiprocessing_child
+)
+
+
+def _create_monitor_handler(path: str) -> MemoryHandler:
     directory = os.path.dirname(path)
     os.makedirs(directory, exist_ok=True)
     _restore_user_ownership(directory)
 
-    handler = RotatingFileHandler(
+    handler = _MonitorFileHandler(
         path,
         maxBytes=MONITOR_MAX_BYTES,
         backupCount=MONITOR_BACKUP_COUNT,
@@ -146,7 +298,6 @@ def _create_monitor_handler(path: str) -> RotatingFileHandler:
     except OSError:
         pass
 
-    handler._input_remapper_monitor_handler = True
     handler.setLevel(logging.DEBUG)
     handler.setFormatter(
         logging.Formatter(
@@ -154,7 +305,38 @@ def _create_monitor_handler(path: str) -> RotatingFileHandler:
             datefmt="%Y-%m-%d %H:%M:%S",
         )
     )
-    return handler
+
+    # logging.shutdown flushes the buffer when the process exits
+    memory_handler = _MonitorMemoryHandler(
+        MONITOR_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=handler,
+    )
+    memory_handler._input_remapper_monitor_handler = True
+    memory_handler.setLevel(logging.DEBUG)
+    return memory_handler
+
+
+def flush_monitor_on_sigterm() -> None:
+    """Write the buffered monitor records before SIGTERM ends the process.
+
+    systemd stops the service with SIGTERM, whose default action doesn't run
+    logging.shutdown. Meant to be called from the entry point of the daemon.
+    Handlers that were installed by someone else are kept.
+    """
+
+    def on_sigterm(signum, _frame):
+        _flush_monitor_handlers()
+        # terminate the same way as without this handler
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+    try:
+        if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, on_sigterm)
+    except ValueError:
+        # signal handlers can only be installed by the main thread
+        pass
 
 
 class Logger(logging.Logger):
@@ -164,11 +346,8 @@ class Logger(logging.Logger):
         if not self.isEnabledFor(logging.DEBUG):
             return
 
-        lines_and_indent = self._parse_mapping_handler(mapping_handler)
-        for line in lines_and_indent:
-            indent = "    "
-            msg = indent * line[1] + line[0]
-            self._log(logging.DEBUG, msg, args=None)
+        for line, indent in self._iter_mapping_handler(mapping_handler):
+            self._log(logging.DEBUG, "    " * indent + line, args=None)
 
     def write(self, key, uinput):
         """Log that an event is being written
@@ -185,39 +364,35 @@ class Logger(logging.Logger):
 
         global previous_write_debug_log
 
-        str_key = repr(key)
-        str_key = str_key.replace(",)", ")")
-
-        msg = f'Writing {str_key} to "{uinput.name}"'
-
-        if msg == previous_write_debug_log:
+        # compare before formatting anything, most writes repeat the previous one
+        key_and_name = (key, uinput.name)
+        if key_and_name == previous_write_debug_log:
             # avoid some super spam from EV_ABS events
             return
 
-        previous_write_debug_log = msg
+        previous_write_debug_log = key_and_name
+
+        str_key = repr(key)
+        str_key = str_key.replace(",)", ")")
 
+        msg = f'Writing {str_key} to "{uinput.name}"'
         self._log(logging.DEBUG, msg, args=None, stacklevel=2)
 
-    def _parse_mapping_handler(self, mapping_handler):
-        indent = 0
-        lines_and_indent = []
+    def _iter_mapping_handler(self, mapping_handler, indent=0):
+        """Yield (repr, indent) for each handler in the chain of mapping_handler."""
         while True:
             if isinstance(mapping_handler, list):
                 for sub_handler in mapping_handler:
-                    sub_list = self._parse_mapping_handler(sub_handler)
-                    for line in sub_list:
-                        line[1] += indent
-                    lines_and_indent.extend(sub_list)
-                break
+                    yield from self._iter_mapping_handler(sub_handler, indent)
+                return
 
-            lines_and_indent.append([repr(mapping_handler), indent])
+            yield repr(mapping_handler), indent
             try:
                 mapping_handler = mapping_handler.child
             except AttributeError:
-                break
+                return
 
             indent += 1
-        return lines_and_indent
 
     def is_debug(self) -> bool:
         """True, if the logger is currently in DEBUG mode."""
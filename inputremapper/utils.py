@@ -24,6 +24,9 @@ import os
 import re
 import struct
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from hashlib import md5
 from typing import Optional, NewType, Iterable, List, Tuple, Dict, Any
 
@@ -42,9 +45,11 @@ def get_device_hash(device: evdev.InputDevice) -> DeviceHash:
     # seeded at python startup.
     # A non-cryptographic hash would be faster but there is none in the standard lib
     # This hash needs to stay the same across reboots, and even stay the same when
-    # moving the config to a new computer.
-    s = str(device.capabilities(absinfo=False)) + device.name
-    return DeviceHash(md5(s.encode()).hexdigest().lower())
+    # moving the config to a new computer. Presets store it, so the hashed bytes
+    # must not change. They are fed in two parts instead of concatenating them.
+    hash_ = md5(str(device.capabilities(absinfo=False)).encode())
+    hash_.update(device.name.encode())
+    return DeviceHash(hash_.hexdigest())
 
 
 def get_evdev_constant_name(type_: Optional[int], code: Optional[int], *_) -> str:
@@ -52,12 +57,18 @@ def get_evdev_constant_name(type_: Optional[int], code: Optional[int], *_) -> st
 
     Returns "unknown" for unknown events.
     """
+    return _get_evdev_constant_name(type_, code)
+
+
+# The ecodes tables never change at runtime, so the names can be cached.
+@lru_cache(maxsize=4096)
+def _get_evdev_constant_name(type_: Optional[int], code: Optional[int]) -> str:
     # using this function is more readable than
     #   type_, code = event.type_and_code
     #   name = evdev.ecodes.bytype[type_][code]
     name = evdev.ecodes.bytype.get(type_, {}).get(code)
 
-    if type(name) in [list, tuple]:
+    if isinstance(name, (list, tuple)):
         # python-evdev >= 1.8.0 uses tuples
         name = name[0]
 
@@ -84,6 +95,14 @@ def _unescape_vdf(value: str) -> str:
     return value.replace("\\\\", "\\").replace('\\"', '"')
 
 
+_VDF_PATH_PATTERN = re.compile(r'"path"\s*"([^"]+)"')
+_VDF_NUMBERED_VALUE_PATTERN = re.compile(r'"\d+"\s*"([^"]+)"')
+_VDF_NAME_PATTERN = re.compile(r'"name"\s*"([^"]+)"')
+_VDF_APPID_PATTERN = re.compile(r'"appid"\s*"(\d+)"')
+_VDF_INSTALLDIR_PATTERN = re.compile(r'"installdir"\s*"([^"]+)"')
+_VDF_NAME_OR_APPID_PATTERN = re.compile(r'"(name|appid)"\s*"([^"]+)"')
+
+
 def _parse_libraryfolders(path: str) -> Iterable[str]:
     if not os.path.exists(path):
         return []
@@ -97,11 +116,11 @@ def _parse_libraryfolders(path: str) -> Iterable[str]:
     paths = set()
 
     # Newer format: "path" "/home/user/SteamLibrary"
-    for match in re.findall(r'"path"\s*"([^"]+)"', contents):
+    for match in _VDF_PATH_PATTERN.findall(contents):
         paths.add(_unescape_vdf(match))
 
     # Older format: "0" "/home/user/SteamLibrary"
-    for match in re.findall(r'"\d+"\s*"([^"]+)"', contents):
+    for match in _VDF_NUMBERED_VALUE_PATTERN.findall(contents):
         if "/" in match:
             paths.add(_unescape_vdf(match))
 
@@ -314,14 +333,21 @@ def _parse_appmanifest(path: str) -> Optional[Tuple[str, str]]:
     except OSError:
         return None
 
-    name_match = re.search(r'"name"\s*"([^"]+)"', contents)
-    appid_match = re.search(r'"appid"\s*"(\d+)"', contents)
-    if not name_match:
+    # find both keys in a single pass over the manifest
+    found: Dict[str, str] = {}
+    for match in _VDF_NAME_OR_APPID_PATTERN.finditer(contents):
+        key, value = match.groups()
+        if key in found or (key == "appid" and not value.isdigit()):
+            continue
+
+        found[key] = value
+        if len(found) == 2:
+            break
+
+    if "name" not in found:
         return None
 
-    name = _unescape_vdf(name_match.group(1))
-    appid = appid_match.group(1) if appid_match else ""
-    return appid, name
+    return found.get("appid", ""), _unescape_vdf(found["name"])
 
 
 def _parse_appmanifest_details(path: str) -> Optional[Tuple[str, str, str]]:
@@ -331,12 +357,15 @@ def _parse_appmanifest_details(path: str) -> Optional[Tuple[str, str, str]]:
     except OSError:
         return None
 
-    name_match = re.search(r'"name"\s*"([^"]+)"', contents)
-    appid_match = re.search(r'"appid"\s*"(\d+)"', contents)
-    dir_match = re.search(r'"installdir"\s*"([^"]+)"', contents)
-    if not name_match or not dir_match:
+    name_match = _VDF_NAME_PATTERN.search(contents)
+    if not name_match:
+        return None
+
+    dir_match = _VDF_INSTALLDIR_PATTERN.search(contents)
+    if not dir_match:
         return None
 
+    appid_match = _VDF_APPID_PATTERN.search(contents)
     name = _unescape_vdf(name_match.group(1))
     appid = appid_match.group(1) if appid_match else ""
     installdir = _unescape_vdf(dir_match.group(1))
@@ -371,12 +400,40 @@ def _is_steam_runtime(
     return False
 
 
-def get_steam_installed_games() -> List[Tuple[str, str]]:
-    """Return a list of (appid, name) for locally installed Steam games."""
+# Scanning the libraries reads every appmanifest, reuse the result for a while.
+STEAM_GAMES_CACHE_SECONDS = 30
+STEAM_MANIFEST_READERS = 8
+_steam_games_cache: Optional[Tuple[float, List[Tuple[str, str]]]] = None
+
+
+def get_steam_installed_games(use_cache: bool = True) -> List[Tuple[str, str]]:
+    """Return a list of (appid, name) for locally installed Steam games.
+
+    The result of the previous scan is reused for STEAM_GAMES_CACHE_SECONDS,
+    unless use_cache is False.
+    """
+    global _steam_games_cache
+
+    now = time.monotonic()
+    if (
+        use_cache
+        and _steam_games_cache is not None
+        and now - _steam_games_cache[0] < STEAM_GAMES_CACHE_SECONDS
+    ):
+        return list(_steam_games_cache[1])
+
+    games = _scan_steam_installed_games()
+    _steam_games_cache = (now, games)
+    return list(games)
+
+
+def _scan_steam_installed_games() -> List[Tuple[str, str]]:
     games: dict[str, str] = {}
 
     library_dirs = _steam_library_dirs()
 
+    appids_from_name = []
+    manifest_paths = []
     for library in library_dirs:
         try:
             entries = os.listdir(library)
@@ -387,16 +444,25 @@ def get_steam_installed_games() -> List[Tuple[str, str]]:
             if not entry.startswith("appmanifest_") or not entry.endswith(".acf"):
                 continue
 
-            appid_from_name = entry[len("appmanifest_") : -len(".acf")]
-            manifest_path = os.path.join(library, entry)
-            parsed = _parse_appmanifest(manifest_path)
-            if parsed is None:
-                continue
+            appids_from_name.append(entry[len("appmanifest_") : -len(".acf")])
+            manifest_paths.append(os.path.join(library, entry))
 
-            appid, name = parsed
-            appid = appid or appid_from_name
-            if appid and not _is_steam_runtime(name, appid=appid):
-                games[appid] = name
+    if len(manifest_paths) > STEAM_MANIFEST_READERS:
+        # Reading the manifests is I/O bound, overlap the reads.
+        with ThreadPoolExecutor(max_workers=STEAM_MANIFEST_READERS) as executor:
+            manifests = list(executor.map(_parse_appmanifest, manifest_paths))
+    else:
+        # not worth starting threads for
+        manifests = [_parse_appmanifest(path) for path in manifest_paths]
+
+    for appid_from_name, parsed in zip(appids_from_name, manifests):
+        if parsed is None:
+            continue
+
+        appid, name = parsed
+        appid = appid or appid_from_name
+        if appid and not _is_steam_runtime(name, appid=appid):
+            games[appid] = name
 
     for appid, name, *_ in get_steam_shortcuts():
         if appid and name and appid not in games:
@@ -21,11 +21,11 @@
 import time
 import unittest
 from typing import Optional, Tuple, Union
-from unittest.mock import MagicMock, call
+from unittest.mock import MagicMock, call, patch
 
 import evdev
 import gi
-from evdev.ecodes import KEY_A, KEY_B, KEY_C
+from evdev.ecodes import KEY_A, KEY_B, KEY_C, KEY_D, KEY_E
 
 gi.require_version("Gdk", "3.0")
 gi.require_version("Gtk", "3.0")
@@ -74,7 +74,9 @@ from inputremapper.gui.components.editor import (
     RecordingStatus,
     RequireActiveMapping,
     GdkEventRecorder,
+    LinkGameDropdown,
 )
+from inputremapper.gui.components import editor
 from inputremapper.gui.components.main import Stack, StatusBar
 from inputremapper.gui.components.common import FlowBoxEntry, Breadcrumbs
 from inputremapper.gui.components.presets import PresetSelection
@@ -358,34 +360,33 @@ class TestMappingListbox(ComponentBaseTest):
             self.message_broker, self.controller_mock, self.gui
         )
 
-        self.message_broker.publish(
-            PresetData(
-                "preset1",
-                (
-                    MappingData(
-                        name="mapping1",
-                        input_combination=InputCombination(
-                            [InputConfig(type=1, code=KEY_C)]
-                        ),
+        self.preset = PresetData(
+            "preset1",
+            (
+                MappingData(
+                    name="mapping1",
+                    input_combination=InputCombination(
+                        [InputConfig(type=1, code=KEY_C)]
                     ),
-                    MappingData(
-                        name="",
-                        input_combination=InputCombination(
-                            [
-                                InputConfig(type=1, code=KEY_A),
-                                InputConfig(type=1, code=KEY_B),
-                            ]
-                        ),
+                ),
+                MappingData(
+                    name="",
+                    input_combination=InputCombination(
+                        [
+                            InputConfig(type=1, code=KEY_A),
+                            InputConfig(type=1, code=KEY_B),
+                        ]
                     ),
-                    MappingData(
-                        name="mapping2",
-                        input_combination=InputCombination(
-                            [InputConfig(type=1, code=KEY_B)]
-                        ),
+                ),
+                MappingData(
+                    name="mapping2",
+                    input_combination=InputCombination(
+                        [InputConfig(type=1, code=KEY_B)]
                     ),
                 ),
-            )
+            ),
         )
+        self.message_broker.publish(self.preset)
 
     def get_selected_row(self) -> MappingSelectionLabel:
         for label in self.gui.get_children():
@@ -402,6 +403,23 @@ class TestMappingListbox(ComponentBaseTest):
         for label in self.gui.get_children():
             select(label)
 
+    def publish_preset(self, name: str, *mappings: Tuple[str, int]):
+        """Publish a preset with one mapping for each (name, key code)."""
+        self.message_broker.publish(
+            PresetData(
+                name,
+                tuple(
+                    MappingData(
+                        name=mapping_name,
+                        input_combination=InputCombination(
+                            [InputConfig(type=1, code=code)]
+                        ),
+                    )
+                    for mapping_name, code in mappings
+                ),
+            )
+        )
+
     def test_populates_listbox(self):
         labels = {row.name for row in self.gui.get_children()}
         self.assertEqual(labels, {"mapping1", "mapping2", "a + b"})
@@ -491,6 +509,161 @@ class TestMappingListbox(ComponentBaseTest):
         bottom_row: MappingSelectionLabel = self.gui.get_row_at_index(2)
         self.assertEqual(bottom_row.combination, InputCombination.empty_combination())
 
+    def test_keeps_rows_when_preset_is_sent_again(self):
+        self.message_broker.publish(
+            MappingData(
+                name="mapping1",
+                input_combination=InputCombination([InputConfig(type=1, code=KEY_C)]),
+            )
+        )
+        rows = self.gui.get_children()
+        selected = self.get_selected_row()
+
+        # for example only the autoload setting changed
+        self.message_broker.publish(
+            PresetData(self.preset.name, self.preset.mappings, autoload=True)
+        )
+        self.assertEqual(self.gui.get_children(), rows)
+        self.assertIs(self.get_selected_row(), selected)
+        self.assertTrue(selected.edit_btn.get_visible())
+        self.controller_mock.load_mapping.assert_not_called()
+
+    def test_rebuilds_rows_when_mappings_changed(self):
+        self.message_broker.publish(
+            MappingData(
+                name="mapping1",
+                input_combination=InputCombination([InputConfig(type=1, code=KEY_C)]),
+            )
+        )
+
+        # same preset and number of mappings, but one has a new name
+        mappings = list(self.preset.mappings)
+        mappings[2] = MappingData(
+            name="renamed",
+            input_combination=InputCombination([InputConfig(type=1, code=KEY_B)]),
+        )
+        self.message_broker.publish(PresetData(self.preset.name, tuple(mappings)))
+        self.assertEqual(
+            [row.name for row in self.gui.get_children()],
+            ["a + b", "mapping1", "renamed"],
+        )
+        self.assertIsNone(self.gui.get_selected_row())
+
+        # and now a mapping got a new combination
+        mappings[2] = MappingData(
+            name="renamed",
+            input_combination=InputCombination([InputConfig(type=1, code=KEY_D)]),
+        )
+        self.message_broker.publish(PresetData(self.preset.name, tuple(mappings)))
+        self.message_broker.publish(mappings[2])
+        self.assertEqual(self.get_selected_row().name, "renamed")
+        self.assertEqual(
+            self.get_selected_row().combination,
+            InputCombination([InputConfig(type=1, code=KEY_D)]),
+        )
+
+    def test_recycles_rows_for_fewer_mappings(self):
+        old_rows = self.gui.get_children()
+        self.publish_preset("preset2", ("zzz", KEY_D), ("aaa", KEY_E))
+
+        rows = self.gui.get_children()
+        self.assertEqual(len(rows), 2)
+        for row in rows:
+            self.assertIn(row, old_rows)
+
+        # the recycled rows show the new mappings, sorted by their new names
+        self.assertEqual([row.name for row in rows], ["aaa", "zzz"])
+        self.assertEqual([row.label.get_label() for row in rows], ["aaa", "zzz"])
+        self.assertEqual(
+            [row.combination for row in rows],
+            [
+                InputCombination([InputConfig(type=1, code=KEY_E)]),
+                InputCombination([InputConfig(type=1, code=KEY_D)]),
+            ],
+        )
+
+        # the removed row stopped listening
+        removed = [row for row in old_rows if row not in rows]
+        self.assertEqual(len(removed), 1)
+        removed_name = removed[0].name
+        self.message_broker.publish(
+            MappingData(name="foo", input_combination=removed[0].combination)
+        )
+        self.assertEqual(removed[0].name, removed_name)
+        self.assertFalse(removed[0].edit_btn.get_visible())
+
+        self.message_broker.publish(
+            MappingData(
+                name="zzz",
+                input_combination=InputCombination([InputConfig(type=1, code=KEY_D)]),
+            )
+        )
+        self.assertIs(self.get_selected_row(), rows[1])
+
+    def test_recycles_rows_for_more_mappings(self):
+        old_rows = self.gui.get_children()
+        self.publish_preset(
+            "preset2",
+            ("d", KEY_D),
+            ("c", KEY_C),
+            ("e", KEY_E),
+            ("b", KEY_B),
+            ("a", KEY_A),
+        )
+
+        rows = self.gui.get_children()
+        self.assertEqual(len(rows), 5)
+        for row in old_rows:
+            self.assertIn(row, rows)
+
+        self.assertEqual([row.name for row in rows], ["a", "b", "c", "d", "e"])
+        self.assertEqual(
+            [row.label.get_label() for row in rows], ["a", "b", "c", "d", "e"]
+        )
+        self.assertEqual(
+            [row.combination for row in rows],
+            [
+                InputCombination([InputConfig(type=1, code=code)])
+                for code in (KEY_A, KEY_B, KEY_C, KEY_D, KEY_E)
+            ],
+        )
+
+        for code in (KEY_A, KEY_B, KEY_C, KEY_D, KEY_E):
+            combination = InputCombination([InputConfig(type=1, code=code)])
+            self.message_broker.publish(
+                MappingData(name="", input_combination=combination)
+            )
+            self.assertEqual(self.get_selected_row().combination, combination)
+
+    def test_rekeys_row_after_combination_update(self):
+        old_combination = InputCombination([InputConfig(type=1, code=KEY_C)])
+        new_combination = InputCombination([InputConfig(type=1, code=KEY_D)])
+        self.message_broker.publish(
+            MappingData(name="mapping1", input_combination=old_combination)
+        )
+        row = self.get_selected_row()
+
+        self.message_broker.publish(CombinationUpdate(old_combination, new_combination))
+        self.assertEqual(row.combination, new_combination)
+
+        # the row is found by its new combination, and not by the old one anymore
+        self.gui.unselect_all()
+        self.message_broker.publish(
+            MappingData(name="mapping1", input_combination=new_combination)
+        )
+        self.assertIs(self.get_selected_row(), row)
+
+        self.gui.unselect_all()
+        self.message_broker.publish(
+            MappingData(name="mapping1", input_combination=old_combination)
+        )
+        self.assertRaises(Exception, self.get_selected_row)
+
+        # recycling the rows afterwards still works
+        self.publish_preset("preset2", ("foo", KEY_D), ("bar", KEY_E))
+        names = [label.name for label in self.gui.get_children()]
+        self.assertEqual(names, ["bar", "foo"])
+
 
 @test_setup
 class TestMappingSelectionLabel(ComponentBaseTest):
@@ -827,6 +1000,29 @@ class TestGdkEventRecorder(ComponentBaseTest):
         self._emit_key(window, KEY_A, Gdk.EventType.KEY_PRESS)
         self.assertEqual(label.get_text(), "a")
 
+    def test_key_repeat(self):
+        label = Gtk.Label()
+        window = Gtk.Window()
+        GdkEventRecorder(window, label)
+
+        self._emit_key(window, KEY_A, Gdk.EventType.KEY_PRESS)
+        self.assertEqual(label.get_text(), "a")
+
+        # holding a key repeats its press events
+        self._emit_key(window, KEY_A, Gdk.EventType.KEY_PRESS)
+        self._emit_key(window, KEY_A, Gdk.EventType.KEY_PRESS)
+        self.assertEqual(label.get_text(), "a")
+
+        self._emit_key(window, KEY_B, Gdk.EventType.KEY_PRESS)
+        self._emit_key(window, KEY_B, Gdk.EventType.KEY_PRESS)
+        self.assertEqual(label.get_text(), "a + b")
+
+        self._emit_key(window, KEY_B, Gdk.EventType.KEY_RELEASE)
+        self.assertEqual(label.get_text(), "a + b")
+
+        self._emit_key(window, KEY_B, Gdk.EventType.KEY_PRESS)
+        self.assertEqual(label.get_text(), "b")
+
 
 @test_setup
 class TestCodeEditor(ComponentBaseTest):
@@ -932,6 +1128,72 @@ class TestCodeEditor(ComponentBaseTest):
         self.assertEqual(self.get_text(), "foo")
         self.assertNotIn("opaque-text", self.gui.get_style_context().list_classes())
 
+    def test_text_changed_outside_of_the_editor(self):
+        self.message_broker.publish(MappingData(output_symbol="foo"))
+        self.assertEqual(self.editor.code, "foo")
+        self.assertFalse(self.gui.get_show_line_numbers())
+
+        # for example the autocompletion writes into the buffer
+        self.gui.get_buffer().set_text("foo\nbar")
+        self.assertEqual(self.editor.code, "foo\nbar")
+
+        # the same code is loaded again, but now it is multiline
+        self.message_broker.publish(MappingData(output_symbol="foo\nbar"))
+        self.assertTrue(self.gui.get_show_line_numbers())
+
+        self.gui.get_buffer().set_text("foo")
+        self.message_broker.publish(MappingData(output_symbol="foo"))
+        self.assertEqual(self.editor.code, "foo")
+        self.assertFalse(self.gui.get_show_line_numbers())
+
+
+@test_setup
+class TestLinkGameDropdown(ComponentBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.games = [("1", "Foo")]
+        patcher = patch.object(
+            editor, "get_steam_installed_games", side_effect=lambda: self.games
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.gui = Gtk.ComboBoxText()
+        self.dropdown = LinkGameDropdown(
+            self.message_broker, self.controller_mock, self.gui
+        )
+
+    def get_entries(self):
+        return [(row[1], row[0]) for row in self.gui.get_model()]
+
+    def test_games_changed(self):
+        self.assertEqual(self.get_entries(), [("none", "No Game"), ("1", "Foo")])
+        model = self.gui.get_model()
+
+        # the same games, the model is kept
+        self.message_broker.signal(MessageType.init)
+        self.assertIs(self.gui.get_model(), model)
+
+        self.games = [("1", "Foo"), ("2", "Bar")]
+        self.message_broker.signal(MessageType.init)
+        self.assertEqual(
+            self.get_entries(),
+            [("none", "No Game"), ("1", "Foo"), ("2", "Bar")],
+        )
+
+        self.message_broker.publish(PresetData("preset", (), game_id="2"))
+        self.assertEqual(self.gui.get_active_id(), "2")
+        self.controller_mock.set_game_binding.assert_not_called()
+
+    def test_unknown_game_is_removed_again(self):
+        self.message_broker.publish(PresetData("preset", (), game_id="3"))
+        self.assertEqual(self.gui.get_active_id(), "3")
+        self.assertEqual(len(self.get_entries()), 3)
+
+        # the games didn't change, but the model contains the unknown game
+        self.message_broker.signal(MessageType.init)
+        self.assertEqual(self.get_entries(), [("none", "No Game"), ("1", "Foo")])
+
 
 @test_setup
 class TestRecordingToggle(ComponentBaseTest):
@@ -1196,6 +1458,66 @@ class TestCombinationListbox(ComponentBaseTest):
         self.message_broker.publish(MappingData(input_combination=combination))
         self.assertEqual(len(self.gui.get_children()), 0)
 
+    def publish_combination(self, *input_configs: InputConfig):
+        self.message_broker.publish(
+            MappingData(
+                input_combination=InputCombination(input_configs),
+                target_uinput="keyboard",
+            )
+        )
+
+    def get_events(self):
+        return [entry.input_event for entry in self.gui.get_children()]
+
+    def test_moves_rows(self):
+        key_1 = InputConfig(type=1, code=1)
+        abs_0 = InputConfig(type=3, code=0, analog_threshold=1)
+        key_2 = InputConfig(type=1, code=2)
+        rows = {entry.input_event: entry for entry in self.gui.get_children()}
+
+        # move the second input up
+        self.publish_combination(abs_0, key_1, key_2)
+        self.assertEqual(self.get_events(), [abs_0, key_1, key_2])
+
+        # move the second input down
+        self.publish_combination(abs_0, key_2, key_1)
+        self.assertEqual(self.get_events(), [abs_0, key_2, key_1])
+
+        # the rows are moved, not recreated
+        for entry in self.gui.get_children():
+            self.assertIs(entry, rows[entry.input_event])
+
+    def test_removes_row(self):
+        key_1 = InputConfig(type=1, code=1)
+        key_2 = InputConfig(type=1, code=2)
+        rows = {entry.input_event: entry for entry in self.gui.get_children()}
+
+        self.publish_combination(key_1, key_2)
+        self.assertEqual(self.get_events(), [key_1, key_2])
+        for entry in self.gui.get_children():
+            self.assertIs(entry, rows[entry.input_event])
+
+    def test_selected_row_survives_update(self):
+        key_1 = InputConfig(type=1, code=1)
+        abs_0 = InputConfig(type=3, code=0, analog_threshold=1)
+        key_2 = InputConfig(type=1, code=2)
+        self.message_broker.publish(key_1)
+        selected = self.get_selected_row()
+
+        self.publish_combination(abs_0, key_1, key_2)
+        self.assertIs(self.get_selected_row(), selected)
+
+        self.publish_combination(abs_0, key_2, key_1)
+        self.assertIs(self.get_selected_row(), selected)
+
+        self.publish_combination(key_2, key_1)
+        self.assertIs(self.get_selected_row(), selected)
+        self.controller_mock.load_input_config.assert_not_called()
+
+        # unless it is removed
+        self.publish_combination(key_2)
+        self.assertIsNone(self.gui.get_selected_row())
+
     def test_selects_row_when_selected_event_message_arrives(self):
         self.message_broker.publish(InputConfig(type=3, code=0, analog_threshold=1))
         self.assertEqual(
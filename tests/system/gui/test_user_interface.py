@@ -1,5 +1,7 @@
+import os
+import shutil
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import gi
 from evdev.ecodes import EV_KEY, KEY_A
@@ -10,12 +12,19 @@ gi.require_version("GLib", "2.0")
 gi.require_version("GtkSource", "4")
 from gi.repository import Gtk, Gdk, GLib
 
+from inputremapper.configs.keyboard_layout import XKB_KEYCODE_OFFSET
 from inputremapper.gui.utils import gtk_iteration
 from inputremapper.gui.messages.message_broker import MessageBroker, MessageType
-from inputremapper.gui.user_interface import UserInterface
+from inputremapper.gui.messages.message_data import UserConfirmRequest
+from inputremapper.gui.user_interface import (
+    UserInterface,
+    CONTROLLER_BUTTONS,
+    VERSION_LABEL,
+)
 from inputremapper.configs.mapping import MappingData
 from inputremapper.configs.input_config import InputCombination, InputConfig
 from tests.lib.test_setup import test_setup
+from tests.lib.tmp import tmp
 
 
 @test_setup
@@ -111,3 +120,154 @@ class TestUserInterface(unittest.TestCase):
 
         # 0.5 != 0.501960..., for whatever reason this number is all screwed up
         self.assertAlmostEqual(label.get_opacity(), 0.5, delta=0.1)
+
+    def test_gdk_event_recorder_is_created_with_the_window(self):
+        label: Gtk.Label = self.user_interface.get("gdk-event-recorder-label")
+        event = Gdk.Event()
+        event.type = Gdk.EventType.KEY_PRESS
+        event.hardware_keycode = KEY_A + XKB_KEYCODE_OFFSET
+        self.user_interface.window.emit("event", event)
+        gtk_iteration()
+        self.assertEqual(label.get_text(), "a")
+
+    def test_controller_buttons(self):
+        for button, method_name in CONTROLLER_BUTTONS:
+            self.controller_mock.reset_mock()
+            self.user_interface.get(button).clicked()
+            gtk_iteration()
+            getattr(self.controller_mock, method_name).assert_called_once()
+
+    def test_confirm_dialog_twice(self):
+        responses = []
+        with patch.object(
+            Gtk.MessageDialog,
+            "run",
+            side_effect=[Gtk.ResponseType.ACCEPT, Gtk.ResponseType.CANCEL],
+        ):
+            # the first dialog was destroyed, a new one is created
+            for _ in range(2):
+                self.message_broker.publish(
+                    UserConfirmRequest("foo\nbar", responses.append)
+                )
+
+        self.assertEqual(responses, [True, False])
+
+    def test_about_dialog_set_up_on_first_show(self):
+        label: Gtk.Label = self.user_interface.get("version-label")
+        self.assertNotEqual(label.get_text(), VERSION_LABEL)
+
+        self.user_interface.on_gtk_about_clicked(None)
+        gtk_iteration()
+        self.assertEqual(label.get_text(), VERSION_LABEL)
+        self.assertTrue(self.user_interface.about.get_visible())
+
+        self.user_interface.about.hide()
+        with patch.object(self.user_interface, "_set_up_about_dialog") as set_up:
+            self.user_interface.on_gtk_about_clicked(None)
+            set_up.assert_not_called()
+
+        self.assertTrue(self.user_interface.about.get_visible())
+
+    def use_autostart_dir(self) -> str:
+        """Make the user autostart file point into a fresh directory."""
+        directory = os.path.join(tmp, "autostart")
+        os.makedirs(directory)
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "input-remapper-gtk-autostart.desktop")
+        patcher = patch.object(
+            self.user_interface, "_autostart_user_path", return_value=path
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return path
+
+    def test_write_autostart_file(self):
+        path = self.use_autostart_dir()
+        self.assertFalse(self.user_interface.get_autostart_hidden())
+
+        self.assertTrue(self.user_interface.set_autostart_enabled(True))
+        with open(path, "r") as file:
+            content = file.read()
+        self.assertEqual(
+            content,
+            "[Desktop Entry]\n"
+            "Type=Application\n"
+            "Name=input-remapper-gtk\n"
+            "Exec=input-remapper-gtk\n"
+            "Icon=input-remapper\n"
+            "X-Input-Remapper-AutoHidden=false\n"
+            "X-GNOME-Autostart-enabled=true\n",
+        )
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        # no temporary file is left behind
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+        self.assertTrue(self.user_interface.get_autostart_enabled())
+
+        # writing drops the parsed file, the mtime might not have changed
+        self.assertIn(path, self.user_interface._autostart_files)
+        self.assertTrue(self.user_interface.set_autostart_hidden(True))
+        self.assertNotIn(path, self.user_interface._autostart_files)
+        self.assertTrue(self.user_interface.get_autostart_hidden())
+        self.assertTrue(self.user_interface.get_autostart_enabled())
+
+        self.assertTrue(self.user_interface.set_autostart_enabled(False))
+        self.assertFalse(self.user_interface.get_autostart_enabled())
+        self.assertTrue(self.user_interface.get_autostart_hidden())
+
+    def test_write_autostart_file_fails(self):
+        path = self.use_autostart_dir()
+        self.assertTrue(self.user_interface.set_autostart_enabled(True))
+        with open(path, "r") as file:
+            content = file.read()
+
+        with patch.object(os, "replace", side_effect=OSError("foo")):
+            self.assertFalse(self.user_interface.set_autostart_enabled(False))
+
+        # the previous file is untouched, and the temporary file removed
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+        with open(path, "r") as file:
+            self.assertEqual(file.read(), content)
+        self.assertTrue(self.user_interface.get_autostart_enabled())
+
+    def test_parse_autostart_file_cache(self):
+        path = self.use_autostart_dir()
+        with open(path, "w") as file:
+            file.write("Hidden=true\n")
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+        with patch("builtins.open", wraps=open) as open_mock:
+            self.assertEqual(
+                self.user_interface._parse_autostart_file(path),
+                ({"Hidden": "true"}, True),
+            )
+            self.assertEqual(open_mock.call_count, 1)
+
+            # unchanged files are not read again
+            self.user_interface._parse_autostart_file(path)
+            self.assertEqual(open_mock.call_count, 1)
+
+        # an external edit with the same size but a different mtime
+        with open(path, "w") as file:
+            file.write("Hidden=nope\n")
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+        self.assertEqual(
+            self.user_interface._parse_autostart_file(path),
+            ({"Hidden": "nope"}, False),
+        )
+
+    def test_parse_missing_autostart_file(self):
+        path = self.use_autostart_dir()
+        self.assertEqual(self.user_interface._parse_autostart_file(path), ({}, False))
+        self.assertNotIn(path, self.user_interface._autostart_files)
+
+        with open(path, "w") as file:
+            file.write("X-GNOME-Autostart-enabled=false\n")
+        self.assertEqual(
+            self.user_interface._parse_autostart_file(path),
+            ({"X-GNOME-Autostart-enabled": "false"}, True),
+        )
+
+        # the cached entry is dropped when the file disappears
+        os.remove(path)
+        self.assertEqual(self.user_interface._parse_autostart_file(path), ({}, False))
+        self.assertNotIn(path, self.user_interface._autostart_files)
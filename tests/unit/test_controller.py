@@ -24,7 +24,7 @@ from typing import List
 from unittest.mock import patch, MagicMock, call
 
 import gi
-from evdev.ecodes import EV_ABS, ABS_X, ABS_Y, ABS_RX
+from evdev.ecodes import EV_ABS, EV_KEY, ABS_X, ABS_Y, ABS_RX, KEY_A, KEY_B, KEY_C
 
 from inputremapper.configs.keyboard_layout import keyboard_layout
 from inputremapper.injection.injector import InjectorState
@@ -226,6 +226,32 @@ class TestController(unittest.TestCase):
         self.controller.load_preset(name="preset2")
         self.assertTrue(calls[-1].is_valid())
 
+    def test_on_load_preset_loads_the_top_mapping(self):
+        """The same mapping that the MappingListBox shows at the top."""
+        preset = Preset(PathUtils.get_preset_path("Foo Device", "bar"))
+        for code, name in ((KEY_A, "b"), (KEY_B, "C"), (KEY_C, "a")):
+            preset.add(
+                Mapping(
+                    input_combination=InputCombination(
+                        [InputConfig(type=EV_KEY, code=code)]
+                    ),
+                    name=name,
+                    output_symbol="a",
+                    target_uinput="keyboard",
+                )
+            )
+        preset.save()
+        self.data_manager.load_group("Foo Device 2")
+        calls: List[MappingData] = []
+
+        def f(data):
+            calls.append(data)
+
+        self.message_broker.subscribe(MessageType.mapping, f)
+        # "a" sorts after "C" with a case-sensitive comparison
+        self.controller.load_preset(name="bar")
+        self.assertEqual(calls[-1].name, "a")
+
     def test_on_load_preset_should_provide_default_mapping(self):
         """If there is none."""
         Preset(PathUtils.get_preset_path("Foo Device", "bar")).save()
@@ -539,6 +539,23 @@ class TestInputCombination(unittest.TestCase):
         self.assertIsNone(combination.find_analog_input_config(type_=EV_REL))
         self.assertIsNone(combination.find_analog_input_config())
 
+    def test_has_rel_input(self):
+        combination = InputCombination(
+            (
+                InputConfig(type=EV_KEY, code=BTN_MIDDLE),
+                InputConfig(type=EV_REL, code=REL_Y, analog_threshold=1),
+            )
+        )
+        self.assertTrue(combination.has_rel_input)
+
+        combination = InputCombination(
+            (
+                InputConfig(type=EV_KEY, code=BTN_MIDDLE),
+                InputConfig(type=EV_ABS, code=ABS_X),
+            )
+        )
+        self.assertFalse(combination.has_rel_input)
+
     # region helper methods
     def assert_beautify_single(self, type_, code, direction, expected_beautified_name):
         """
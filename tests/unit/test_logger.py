@@ -21,8 +21,13 @@
 from tests.lib.tmp import tmp
 
 import logging
+import multiprocessing
+import multiprocessing.util
 import os
 import shutil
+import signal
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
@@ -37,6 +42,8 @@ from inputremapper.logging.logger import (
     monitor_env_vars,
     MONITOR_ENV,
     MONITOR_PATH_ENV,
+    _create_monitor_handler,
+    flush_monitor_on_sigterm,
 )
 from tests.lib.test_setup import test_setup
 
@@ -51,6 +58,20 @@ def add_filehandler(log_path: str, debug: bool) -> None:
     logger.info('Starting logging to "%s"', log_path)
 
 
+def read_file(path: str) -> str:
+    with open(path, "r") as file:
+        return file.read()
+
+
+def wait_for(condition, timeout: float = 2) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
 @test_setup
 class TestLogger(unittest.TestCase):
     def tearDown(self):
@@ -172,6 +193,147 @@ class TestLogger(unittest.TestCase):
             self.assertEqual(env_vars.get(MONITOR_ENV), "1")
             self.assertIn("INPUT_REMAPPER_MONITOR_PATH=", monitor_env_prefix())
 
+    def create_monitor_logger(self, name: str):
+        """Get a separate logger that writes to a new monitor handler."""
+        previous_sigterm_handler = signal.getsignal(signal.SIGTERM)
+        self.addCleanup(signal.signal, signal.SIGTERM, previous_sigterm_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        path = os.path.join(tmp, "monitor", f"{name}.log")
+        handler = _create_monitor_handler(path)
+        self.addCleanup(handler.target.close)
+        self.addCleanup(handler.close)
+
+        monitor_logger = logging.Logger(name)
+        monitor_logger.setLevel(logging.DEBUG)
+        monitor_logger.addHandler(handler)
+        return monitor_logger, handler, path
+
+    def test_monitor_flushes_without_further_logging(self):
+        monitor_logger, handler, path = self.create_monitor_logger("idle")
+        handler._flush_interval = 0.1
+
+        monitor_logger.debug("buffered")
+        self.assertNotIn("buffered", read_file(path))
+
+        # nothing else is logged, the flusher thread writes it
+        self.assertTrue(wait_for(lambda: "buffered" in read_file(path)))
+        self.assertIsNone(handler._flush_deadline)
+
+        # errors are written right away
+        monitor_logger.error("error")
+        self.assertIn("error", read_file(path))
+
+    def test_monitor_flushes_on_sigterm(self):
+        monitor_logger, _, path = self.create_monitor_logger("sigterm")
+        # creating a handler doesn't install anything
+        self.assertIs(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+
+        flush_monitor_on_sigterm()
+        context = multiprocessing.get_context("fork")
+        logged = context.Event()
+
+        def run():
+            monitor_logger.debug("before sigterm")
+            logged.set()
+            time.sleep(10)
+
+        process = context.Process(target=run)
+        process.start()
+        self.assertTrue(logged.wait(5))
+        process.terminate()
+        process.join(5)
+
+        self.assertEqual(process.exitcode, -signal.SIGTERM)
+        self.assertIn("before sigterm", read_file(path))
+
+    def test_monitor_reentrant_flush(self):
+        monitor_logger, handler, path = self.create_monitor_logger("reentrant")
+        handle = handler.target.handle
+
+        def interrupted_handle(record):
+            handle(record)
+            # like a SIGTERM arriving after the first record was written
+            handler.flush()
+
+        monitor_logger.debug("first")
+        monitor_logger.debug("second")
+        with patch.object(handler.target, "handle", interrupted_handle):
+            handler.flush()
+
+        content = read_file(path)
+        self.assertEqual(content.count("first"), 1)
+        self.assertEqual(content.count("second"), 1)
+        self.assertEqual(handler.buffer, [])
+
+    def test_monitor_fork_and_exit(self):
+        monitor_logger, handler, path = self.create_monitor_logger("fork")
+        context = multiprocessing.get_context("fork")
+
+        monitor_logger.debug("parent record")
+
+        def run():
+            monitor_logger.debug("child record")
+
+        # the child doesn't flush explicitly, and ends with os._exit
+        process = context.Process(target=run)
+        process.start()
+        process.join(5)
+        self.assertEqual(process.exitcode, 0)
+
+        handler.flush()
+        content = read_file(path)
+        # written once before forking, and not again by the child
+        self.assertEqual(content.count("parent record"), 1)
+        self.assertEqual(content.count("child record"), 1)
+
+    def test_monitor_flusher_in_forked_child(self):
+        monitor_logger, handler, path = self.create_monitor_logger("fork-timer")
+        handler._flush_interval = 0.1
+        context = multiprocessing.get_context("fork")
+
+        def run():
+            monitor_logger.debug("child record")
+            # the exitcode tells if the flusher thread of the child wrote it
+            written = wait_for(lambda: "child record" in read_file(path))
+            raise SystemExit(0 if written else 1)
+
+        monitor_logger.debug("parent record")
+        process = context.Process(target=run)
+        process.start()
+        process.join(5)
+        self.assertEqual(process.exitcode, 0)
+
+        # the flusher thread of the parent still works after forking
+        monitor_logger.debug("parent record after fork")
+        self.assertTrue(wait_for(lambda: "parent record after fork" in read_file(path)))
+        self.assertEqual(read_file(path).count("parent record\n"), 1)
+
+    def test_monitor_handlers_share_one_flusher(self):
+        patch_after_fork = patch.object(multiprocessing.util, "register_after_fork")
+        with patch.object(os, "register_at_fork") as register_at_fork:
+            with patch_after_fork as register_after_fork:
+                monitor_logger_1, handler_1, path_1 = self.create_monitor_logger("one")
+                monitor_logger_2, handler_2, path_2 = self.create_monitor_logger("two")
+
+        # the fork hooks are registered once when the module is imported
+        register_at_fork.assert_not_called()
+        register_after_fork.assert_not_called()
+
+        handler_1._flush_interval = 0.1
+        handler_2._flush_interval = 0.2
+        monitor_logger_1.debug("first")
+        monitor_logger_2.debug("second")
+        self.assertTrue(wait_for(lambda: "first" in read_file(path_1)))
+        self.assertTrue(wait_for(lambda: "second" in read_file(path_2)))
+
+        flushers = [
+            thread
+            for thread in threading.enumerate()
+            if thread.name == "input-remapper-monitor-flusher"
+        ]
+        self.assertEqual(len(flushers), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -60,6 +60,21 @@ class TestMessageBroker(unittest.TestCase):
         self.assertEqual(len(listener.calls), 1)
         self.assertEqual(listener.calls[0], Message(MessageType.test1, "a"))
 
+    def test_unsubscribe_from_all_message_types(self):
+        message_broker = MessageBroker()
+        listener = Listener()
+        message_broker.subscribe(MessageType.test1, listener)
+        message_broker.subscribe(MessageType.test2, listener)
+        message_broker.unsubscribe(listener)
+        message_broker.publish(Message(MessageType.test1, "a"))
+        message_broker.publish(Message(MessageType.test2, "b"))
+        self.assertEqual(len(listener.calls), 0)
+
+        # can subscribe again afterwards
+        message_broker.subscribe(MessageType.test2, listener)
+        message_broker.publish(Message(MessageType.test2, "c"))
+        self.assertEqual(listener.calls, [Message(MessageType.test2, "c")])
+
     def test_unsubscribe_unknown_listener(self):
         """nothing happens if we unsubscribe an unknown listener"""
         message_broker = MessageBroker()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import unittest
+from typing import Optional
+from unittest.mock import patch
+
+from gi.repository import GLib
+
+from inputremapper.gui.components import editor
+from inputremapper.gui.components.editor import SteamProcessWatcher
+from tests.lib.test_setup import test_setup
+from tests.lib.tmp import tmp
+
+COMMON = "/home/user/.steam/steam/steamapps/common"
+
+
+@test_setup
+class TestSteamProcessWatcher(unittest.TestCase):
+    def setUp(self):
+        self.proc = os.path.join(tmp, "proc")
+        os.makedirs(self.proc)
+
+    def tearDown(self):
+        shutil.rmtree(self.proc)
+
+    def create_watcher(self, games=(), shortcuts=()) -> SteamProcessWatcher:
+        with (
+            patch.object(
+                editor, "get_steam_installed_game_paths", return_value=list(games)
+            ),
+            patch.object(editor, "get_steam_shortcuts", return_value=list(shortcuts)),
+            patch.object(GLib, "timeout_add_seconds"),
+        ):
+            watcher = SteamProcessWatcher()
+
+        watcher._proc = self.proc
+        return watcher
+
+    def add_process(
+        self,
+        pid: int,
+        exe: Optional[str] = "/usr/bin/bash",
+        cwd: Optional[str] = "/home/user",
+        cmdline: str = "bash",
+        environ: bytes = b"",
+        starttime: int = 100,
+        flags: int = 0,
+        state: str = "S",
+    ):
+        """Write a process into the fake /proc, replacing the previous one."""
+        directory = os.path.join(self.proc, str(pid))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        # 19 fields after the state until the starttime
+        stat = f"{pid} (name (x)) {state} 1 1 1 0 -1 {flags} {'0 ' * 12}{starttime} 0"
+        with open(os.path.join(directory, "stat"), "w") as file:
+            file.write(stat)
+        with open(os.path.join(directory, "cmdline"), "wb") as file:
+            file.write(b"".join(arg.encode() + b"\0" for arg in cmdline.split()))
+        with open(os.path.join(directory, "environ"), "wb") as file:
+            file.write(environ)
+        if exe is not None:
+            os.symlink(exe, os.path.join(directory, "exe"))
+        if cwd is not None:
+            os.symlink(cwd, os.path.join(directory, "cwd"))
+
+    def poll(self, watcher: SteamProcessWatcher) -> int:
+        """Run one tick and return how many processes were inspected."""
+        with patch.object(
+            watcher, "_inspect_pid", wraps=watcher._inspect_pid
+        ) as inspect_pid:
+            watcher._poll()
+        return inspect_pid.call_count
+
+    def appids(self, watcher: SteamProcessWatcher):
+        return [hit["appid"] for hit in watcher.get_hits()]
+
+    def test_reuses_inspections(self):
+        watcher = self.create_watcher()
+        self.add_process(10, environ=b"SteamAppId=10\0")
+        self.add_process(11)
+
+        self.assertEqual(self.poll(watcher), 2)
+        self.assertEqual(self.appids(watcher), ["10"])
+        self.assertEqual(watcher._pid_cache[10][0], 100)
+
+        self.assertEqual(self.poll(watcher), 0)
+        self.assertEqual(self.appids(watcher), ["10"])
+
+    def test_pid_reuse(self):
+        watcher = self.create_watcher()
+        self.add_process(10, environ=b"SteamAppId=10\0")
+        self.poll(watcher)
+        self.assertEqual(self.appids(watcher), ["10"])
+
+        # another process got the pid between two ticks. Same links, but it
+        # started later.
+        self.add_process(10, starttime=200)
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), [])
+        self.assertEqual(watcher._pid_cache[10][0], 200)
+
+    def test_exec(self):
+        watcher = self.create_watcher([("20", "Game", "/games/common/Game")])
+        self.add_process(10, exe="/usr/bin/bash", cmdline="bash start.sh")
+        self.poll(watcher)
+        self.assertEqual(self.appids(watcher), [])
+
+        # the script exec'd the game, so the pid and starttime stay the same
+        self.add_process(10, exe="/games/common/Game/game", cmdline="./game")
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), ["20"])
+
+        # changing the directory is noticed as well
+        self.add_process(10, exe="/games/common/Game/game", cwd="/tmp")
+        self.assertEqual(self.poll(watcher), 1)
+
+    def test_evicts_vanished_pids(self):
+        changes = []
+        watcher = self.create_watcher()
+        watcher._on_change = changes.append
+        self.add_process(10, environ=b"SteamAppId=10\0")
+        self.add_process(11)
+        self.poll(watcher)
+        self.assertEqual(changes, [["10"]])
+
+        shutil.rmtree(os.path.join(self.proc, "10"))
+        self.poll(watcher)
+        self.assertEqual(list(watcher._pid_cache), [11])
+        self.assertEqual(self.appids(watcher), [])
+        self.assertEqual(changes, [["10"], []])
+
+        # A process that shows up with that pid again is inspected from scratch,
+        # even if it looks the same
+        self.add_process(10, environ=b"SteamAppId=10\0")
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), ["10"])
+
+    def test_skips_kernel_threads_and_zombies(self):
+        watcher = self.create_watcher()
+        self.add_process(2, exe=None, cwd=None, cmdline="", flags=0x00208040)
+        self.add_process(3, state="Z", environ=b"SteamAppId=10\0")
+
+        self.assertEqual(self.poll(watcher), 0)
+        self.assertEqual(watcher._pid_cache, {2: (100, False, None, None)})
+        self.assertEqual(self.appids(watcher), [])
+
+        self.assertEqual(self.poll(watcher), 0)
+
+        # a new process that got the pid of the kernel thread is looked at
+        self.add_process(2, starttime=200, environ=b"SteamAppId=10\0")
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), ["10"])
+
+    def test_other_user_processes(self):
+        watcher = self.create_watcher()
+        # neither root nor the owner of the fake /proc
+        watcher._uid = os.getuid() + 1
+        self.add_process(10, cmdline="game -appid 7", environ=b"SteamAppId=10\0")
+
+        # only the cmdline is looked at
+        with patch.object(watcher, "_safe_readlink") as readlink:
+            self.assertEqual(self.poll(watcher), 1)
+            readlink.assert_not_called()
+        self.assertEqual(self.appids(watcher), ["7"])
+        self.assertTrue(watcher._pid_cache[10][1])
+
+        self.assertEqual(self.poll(watcher), 0)
+        self.assertEqual(self.appids(watcher), ["7"])
+
+        self.add_process(10, cmdline="other", starttime=200)
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), [])
+
+    def test_other_user_process_exec(self):
+        watcher = self.create_watcher()
+        watcher._uid = os.getuid() + 1
+        self.add_process(10, cmdline="sh start.sh")
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), [])
+
+        # the script exec'd the game, so the pid and starttime stay the same
+        self.add_process(10, cmdline="game -appid 7")
+        self.assertEqual(self.poll(watcher), 1)
+        self.assertEqual(self.appids(watcher), ["7"])
+
+        self.assertEqual(self.poll(watcher), 0)
+
+    def test_path_sibling_prefixes(self):
+        watcher = self.create_watcher(
+            [
+                ("1", "Foobar", f"{COMMON}/Foobar"),
+                ("2", "Foobarbaz", f"{COMMON}/Foobarbaz"),
+            ]
+        )
+        match = watcher._match_path_appid
+        self.assertEqual(match(f"{COMMON}/Foobar/game", "", ""), "1")
+        self.assertEqual(match(f"{COMMON}/Foobarbaz/game", "", ""), "2")
+        self.assertEqual(match("", "", f"run {COMMON}/Foobar/game"), "1")
+        self.assertEqual(match("", "", f"run {COMMON}/Foobarbaz/game"), "2")
+
+        # a directory that only starts like an installed game doesn't match
+        watcher = self.create_watcher([("1", "Foobar", f"{COMMON}/Foobar")])
+        match = watcher._match_path_appid
+        self.assertEqual(match(f"{COMMON}/Foobarbaz/game", "", ""), "")
+        self.assertEqual(match("", f"{COMMON}/Foobarbaz", ""), "")
+        self.assertEqual(match("", "", f"run {COMMON}/Foobarbaz/game"), "")
+        self.assertEqual(match("", "", f"run {COMMON}/Foobar"), "1")
+        self.assertEqual(match("", "", f"{COMMON}/Foobar/game -x"), "1")
+
+    def test_path_nested_install_dirs(self):
+        watcher = self.create_watcher(
+            [
+                ("1", "Foo", f"{COMMON}/Foo"),
+                ("2", "Foo Bar", f"{COMMON}/Foo/Bar"),
+            ]
+        )
+        match = watcher._match_path_appid
+        self.assertEqual(match(f"{COMMON}/Foo/Bar/bin/game", "", ""), "2")
+        self.assertEqual(match(f"{COMMON}/Foo/game", "", ""), "1")
+        # the longest match of exe, cwd and cmdline wins
+        self.assertEqual(match(f"{COMMON}/Foo/game", f"{COMMON}/Foo/Bar", ""), "2")
+        self.assertEqual(
+            match(f"{COMMON}/Foo/game", "", f"{COMMON}/Foo/game {COMMON}/Foo/Bar/x"),
+            "2",
+        )
+
+    def test_path_cwd_only(self):
+        watcher = self.create_watcher([("1", "Foo", f"{COMMON}/Foo")])
+        match = watcher._match_path_appid
+        self.assertEqual(
+            match("/usr/bin/wine64-preloader", f"{COMMON}/Foo/bin", "game.exe"),
+            "1",
+        )
+        self.assertEqual(match("/usr/bin/wine64-preloader", "/tmp", "game.exe"), "")
+
+    def test_path_wine_cmdline(self):
+        watcher = self.create_watcher([("1", "Foo", f"{COMMON}/Foo")])
+        match = watcher._match_path_appid
+        wine_path = COMMON.replace("/", "\\") + "\\Foo\\game.exe"
+        self.assertEqual(match("/usr/bin/wine", "/", f"Z:{wine_path}"), "1")
+        self.assertEqual(match("/usr/bin/wine", "/", "C:\\windows\\explorer.exe"), "")
+        # the compatdata prefix of proton is checked first
+        self.assertEqual(
+            match("/usr/bin/wine", "/", f"{COMMON}/../compatdata/3/pfx Z:{wine_path}"),
+            "3",
+        )
+
+    def test_environ_picks_the_same_values_as_a_full_parse(self):
+        watcher = self.create_watcher()
+        blob = (
+            b"SteamAppId=10\0"
+            b"HOME=/home/user\0"
+            b"XSteamAppId=99\0"
+            b"SteamAppId=20\0"
+            b"SteamGameId=0\0"
+            b"NOT_A_VARIABLE\0"
+            b"STEAM_COMPAT_APP_ID=30\0"
+            b"STEAM_COMPAT_DATA_PATH=/a=b/compatdata/40\0"
+            b"container=flatpak"
+        )
+        path = os.path.join(self.proc, "environ")
+        with open(path, "wb") as file:
+            file.write(blob)
+
+        # the way all variables were parsed before, later duplicates win
+        expected = {}
+        for item in blob.split(b"\0"):
+            if b"=" in item:
+                key, value = item.split(b"=", 1)
+                expected[key.decode()] = value.decode()
+
+        keys = {key for key, _needle in watcher._environ_needles}
+        env = watcher._safe_read_environ(path)
+        self.assertEqual(
+            env, {key: value for key, value in expected.items() if key in keys}
+        )
+        self.assertEqual(env["SteamAppId"], "20")
+        self.assertEqual(env["SteamGameId"], "0")
+        self.assertNotIn("XSteamAppId", env)
+        self.assertEqual(
+            watcher._get_environ_matches(env), [("env", "20"), ("compat", "30")]
+        )
+
+    def test_environ_zero_appid(self):
+        watcher = self.create_watcher()
+        path = os.path.join(self.proc, "environ")
+        with open(path, "wb") as file:
+            file.write(b"SteamAppId=0\0SteamGameId=5\0STEAM_COMPAT_APP_ID=0\0")
+
+        env = watcher._safe_read_environ(path)
+        self.assertEqual(
+            env, {"SteamAppId": "0", "SteamGameId": "5", "STEAM_COMPAT_APP_ID": "0"}
+        )
+        # a zero SteamAppId means that this is not a game
+        self.assertEqual(watcher._get_env_appid(env), "")
+        self.assertEqual(watcher._get_environ_matches(env), [("compat", "0")])
+
+        self.assertEqual(watcher._safe_read_environ(f"{path}-missing"), {})
+
+    def test_cmd_appid_priority(self):
+        watcher = self.create_watcher()
+        get = watcher._get_cmd_appid
+        self.assertEqual(get("/usr/bin/game --fullscreen"), "")
+        self.assertEqual(get("game -appid 5"), "5")
+        self.assertEqual(get("game -gameId=7"), "7")
+        self.assertEqual(get("steam steam://rungameid/8"), "8")
+        # not the leftmost argument wins, but the most important one
+        self.assertEqual(get("game -gameid 7 --appid=5"), "5")
+        self.assertEqual(get("game -appid 3 --appid 4"), "4")
+        self.assertEqual(get("game --appid=5 SteamAppId=6"), "6")
+        # an appid of 0 means that there is none
+        self.assertEqual(get("game SteamAppId=0 --appid=5"), "")
+        # large ids of non-steam games are truncated to 32 bit
+        self.assertEqual(get("game -gameid 12884901889"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
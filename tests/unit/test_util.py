@@ -19,12 +19,24 @@
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
 
+import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 from evdev._ecodes import EV_ABS, ABS_X, BTN_WEST, BTN_Y, EV_KEY, KEY_A
 
-from inputremapper.utils import get_evdev_constant_name
+from inputremapper import utils
+from inputremapper.utils import get_evdev_constant_name, get_steam_installed_games
 from tests.lib.test_setup import test_setup
+from tests.lib.tmp import tmp
+
+
+def write_appmanifest(library: str, appid: str, content: str) -> None:
+    os.makedirs(library, exist_ok=True)
+    path = os.path.join(library, f"appmanifest_{appid}.acf")
+    with open(path, "w") as file:
+        file.write(f'"AppState"\n{{\n{content}\n}}\n')
 
 
 @test_setup
@@ -41,3 +53,62 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(get_evdev_constant_name(EV_KEY, KEY_A), "KEY_A")
 
         self.assertEqual(get_evdev_constant_name(EV_ABS, ABS_X), "ABS_X")
+
+    def test_get_steam_installed_games_is_cached(self):
+        games = [("10", "Counter-Strike")]
+        with (
+            patch.object(utils, "_steam_games_cache", None),
+            patch.object(
+                utils,
+                "_scan_steam_installed_games",
+                return_value=games,
+            ) as scan,
+        ):
+            self.assertEqual(get_steam_installed_games(), games)
+            self.assertEqual(get_steam_installed_games(), games)
+            self.assertEqual(scan.call_count, 1)
+
+            # modifying the result doesn't modify the cache
+            get_steam_installed_games().clear()
+            self.assertEqual(get_steam_installed_games(), games)
+
+            self.assertEqual(get_steam_installed_games(use_cache=False), games)
+            self.assertEqual(scan.call_count, 2)
+
+    def test_scan_steam_installed_games(self):
+        libraries = [os.path.join(tmp, "steam", name) for name in ("a", "b")]
+        for i in range(20):
+            library = libraries[i % 2]
+            write_appmanifest(library, str(i), f'"appid" "{i}"\n"name" "Game {i:02}"')
+
+        # the appid is taken from the file name if it is missing
+        write_appmanifest(libraries[0], "100", '"name" "No Appid"')
+        # the later library wins for duplicates
+        write_appmanifest(libraries[0], "200", '"appid" "200"\n"name" "Old"')
+        write_appmanifest(libraries[1], "200", '"appid" "200"\n"name" "New"')
+        write_appmanifest(libraries[1], "300", '"appid" "1493710"\n"name" "Proton"')
+        write_appmanifest(libraries[1], "400", '"appid" "400"')
+
+        with (
+            patch.object(utils, "_steam_library_dirs", return_value=libraries),
+            patch.object(utils, "get_steam_shortcuts", return_value=[]),
+            patch.object(
+                utils, "ThreadPoolExecutor", wraps=ThreadPoolExecutor
+            ) as executor,
+        ):
+            threaded = utils._scan_steam_installed_games()
+            self.assertEqual(executor.call_count, 1)
+
+            with patch.object(utils, "STEAM_MANIFEST_READERS", 100):
+                serial = utils._scan_steam_installed_games()
+            self.assertEqual(executor.call_count, 1)
+
+        self.assertEqual(threaded, serial)
+        self.assertEqual(
+            threaded,
+            [
+                *[(str(i), f"Game {i:02}") for i in range(20)],
+                ("200", "New"),
+                ("100", "No Appid"),
+            ],
+        )